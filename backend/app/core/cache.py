@@ -0,0 +1,210 @@
+"""In-process caches used to skip repeated OpenAI round trips."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with an optional TTL.
+
+    Used for exact-match lookups, which are cheap enough to run before any
+    embedding or LLM call.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Cache statistics for diagnostics."""
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+
+class SemanticCache:
+    """
+    Similarity-aware cache keyed on embedding vectors.
+
+    A lookup returns the cached value of the most similar stored vector when
+    its cosine similarity is above `threshold`. Vectors are normalized on
+    insert and kept in one contiguous float32 matrix, so a lookup is a single
+    matrix-vector product instead of a Python loop.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 1024
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._matrix: Optional[np.ndarray] = None  # (N, dim) normalized vectors
+        self._values: List[Any] = []
+        self._created_at: List[float] = []
+        self._last_used: List[float] = []
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, vector: Sequence[float]) -> Optional[Any]:
+        """Return the cached value for the closest vector, or None on a miss."""
+        query = self._normalize(vector)
+        if query is None:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            self._evict_expired()
+            if self._matrix is None:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[best] = time.monotonic()
+            self.hits += 1
+            return self._values[best]
+
+    def put(self, vector: Sequence[float], value: Any) -> None:
+        """Store a value under its embedding vector, evicting the LRU entry if full."""
+        row = self._normalize(vector)
+        if row is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired()
+            if len(self._values) >= self.max_entries:
+                self._remove(int(np.argmin(self._last_used)))
+
+            row = row.reshape(1, -1)
+            self._matrix = row if self._matrix is None else np.vstack((self._matrix, row))
+            self._values.append(value)
+            self._created_at.append(now)
+            self._last_used.append(now)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._matrix = None
+            self._values.clear()
+            self._created_at.clear()
+            self._last_used.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Cache statistics for diagnostics."""
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        """Return a unit-length float32 copy of the vector (None for a zero vector)."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        if norm == 0.0:
+            return None
+        return array / norm
+
+    def _evict_expired(self) -> None:
+        """Remove entries older than the TTL. Caller must hold the lock."""
+        if not self.ttl_seconds or not self._values:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are appended in creation order, so expired ones sit at the front
+        expired = 0
+        while expired < len(self._created_at) and self._created_at[expired] < cutoff:
+            expired += 1
+        if expired:
+            del self._values[:expired]
+            del self._created_at[:expired]
+            del self._last_used[:expired]
+            self._matrix = self._matrix[expired:] if self._values else None
+
+    def _remove(self, index: int) -> None:
+        """Remove one entry by position. Caller must hold the lock."""
+        del self._values[index]
+        del self._created_at[index]
+        del self._last_used[index]
+        if self._values:
+            self._matrix = np.delete(self._matrix, index, axis=0)
+        else:
+            self._matrix = None
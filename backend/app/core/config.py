@@ -10,6 +10,54 @@ class Settings(BaseSettings):
     openai_api_key: str
     qdrant_url: str
     qdrant_api_key: str = ""  # Optional - empty string if not provided
+    qdrant_prefer_grpc: bool = True  # Search over gRPC (persistent HTTP/2 connection); False = REST
+    qdrant_grpc_port: int = 6334
+    # Pre-filter searches on metadata.country/year. Requires a collection ingested
+    # with the current ingest_data.py (which adds those fields and their indexes)
+    qdrant_metadata_filters: bool = False
+    qdrant_probe_connection: bool = False  # get_collections() probe on connect (the /health check always probes)
+    qdrant_reconnect_backoff_seconds: float = 1.0  # Doubles per consecutive failure
+    qdrant_reconnect_backoff_max_seconds: float = 60.0
+    qdrant_hnsw_ef: int = 64  # HNSW search beam width (server default is 128)
+    qdrant_exact_search_threshold: int = 1000  # Filtered sets below this size use exact search
+    qdrant_timeout_seconds: float = 5.0  # Per-request timeout; a hung search fails fast and is retried
+    qdrant_search_attempts: int = 3  # Tries per search on timeouts, connection errors and 5xx responses
+    qdrant_retry_backoff_seconds: float = 0.2  # Jittered, doubles per retry
+    qdrant_retry_backoff_max_seconds: float = 2.0
+    
+    # V2 Semantic Router intent cache
+    intent_cache_enabled: bool = True
+    intent_cache_similarity_threshold: float = 0.95  # Cosine similarity for a semantic hit
+    intent_cache_ttl_seconds: int = 7 * 24 * 60 * 60  # 7 days
+    intent_cache_max_entries: int = 1024  # Semantic (embedding) entries
+    intent_exact_cache_max_entries: int = 10_000  # Exact-match (request hash) entries
+    
+    # V2 Semantic Router two-pass routing
+    intent_heuristic_confidence_threshold: float = 0.8  # Heuristic results at or above this skip the LLM
+    
+    # V2 Semantic Router LLM prompt
+    intent_few_shot_enabled: bool = False  # Send worked examples with each LLM classification (more prompt tokens)
+    
+    # V2 Semantic Router micro-batching
+    intent_batch_window_ms: int = 20  # How long to wait for more requests before calling the LLM
+    intent_batch_max_size: int = 8
+    
+    # Optional local ONNX intent classifier (empty = disabled, always use the LLM)
+    intent_onnx_model_dir: str = ""
+    intent_onnx_min_confidence: float = 0.8  # Below this on any head, escalate to the LLM
+    
+    # Qdrant query embedding cache (exact query text)
+    query_embedding_cache_max_entries: int = 1024
+    query_embedding_cache_ttl_seconds: int = 300
+    
+    # Qdrant search result cache (query embedding similarity)
+    search_cache_enabled: bool = True
+    search_cache_similarity_threshold: float = 0.97  # Cosine similarity for a semantic hit
+    search_cache_ttl_seconds: int = 300
+    search_cache_max_entries: int = 512  # Per (limit, country, year) combination
+    
+    # RAG memo generation
+    rag_max_concurrent_generations: int = 5  # Parallel section LLM calls per process
     
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent.parent / ".env"),
@@ -0,0 +1,108 @@
+"""Optional local ONNX intent classifier for the V2 Semantic Router."""
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Label order of each classification head, as exported with the model
+HEAD_LABELS: Dict[str, Tuple] = {
+    "is_holding": (False, True),
+    "must_be_bv": (False, True),
+    "intent": ("SETUP", "ADVISORY", "COMPLIANCE"),
+    "entity_type": (None, "BV", "BRANCH", "HOLDING"),
+    "urgency": ("LOW", "MEDIUM", "HIGH"),
+    "industry_context": ("TECH", "FINANCIAL", "GENERAL"),
+}
+
+
+class LocalIntentClassifier:
+    """
+    Distilled intent classifier (MiniLM with 6 heads) running on onnxruntime.
+
+    The model directory must contain `model.onnx` (int8 dynamically quantized)
+    and the matching `tokenizer.json`. The graph takes `input_ids` and
+    `attention_mask` (plus `token_type_ids` if exported) and returns one logits
+    output per head, named as in HEAD_LABELS.
+
+    `onnxruntime` and `tokenizers` are optional dependencies; if either is
+    missing or the model cannot be loaded the classifier stays disabled and
+    the router keeps using the LLM.
+    """
+
+    def __init__(self, model_dir: str, min_confidence: float = 0.8, max_length: int = 256):
+        self.min_confidence = min_confidence
+        self.max_length = max_length
+        self.session = None
+        self.tokenizer = None
+
+        if not model_dir:
+            return
+
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError:
+            logger.warning("Local intent classifier configured but onnxruntime/tokenizers are not installed. Using LLM.")
+            return
+
+        try:
+            model_path = Path(model_dir)
+            self.tokenizer = Tokenizer.from_file(str(model_path / "tokenizer.json"))
+            self.tokenizer.enable_truncation(max_length=self.max_length)
+            self.session = onnxruntime.InferenceSession(
+                str(model_path / "model.onnx"),
+                providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {i.name for i in self.session.get_inputs()}
+            self._output_names = [o.name for o in self.session.get_outputs()]
+            missing = set(HEAD_LABELS) - set(self._output_names)
+            if missing:
+                raise ValueError(f"model is missing heads: {sorted(missing)}")
+            logger.info(f"Local intent classifier loaded from {model_dir}")
+        except Exception as e:
+            logger.warning(f"Failed to load local intent classifier from {model_dir}: {e}. Using LLM.")
+            self.session = None
+            self.tokenizer = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.session is not None
+
+    def classify(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify the user input locally into UserIntent fields.
+
+        Returns None (so the caller escalates to the LLM) when the classifier is
+        disabled, inference fails, or any head is below `min_confidence`.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            encoding = self.tokenizer.encode(user_input)
+            feeds = {
+                "input_ids": np.asarray([encoding.ids], dtype=np.int64),
+                "attention_mask": np.asarray([encoding.attention_mask], dtype=np.int64),
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.asarray([encoding.type_ids], dtype=np.int64)
+
+            outputs = dict(zip(self._output_names, self.session.run(None, feeds)))
+        except Exception as e:
+            logger.warning(f"Local intent classifier failed: {e}. Using LLM.")
+            return None
+
+        fields = {}
+        for head, labels in HEAD_LABELS.items():
+            logits = np.asarray(outputs[head], dtype=np.float32).reshape(-1)
+            probs = np.exp(logits - logits.max())
+            probs /= probs.sum()
+            best = int(np.argmax(probs))
+            if probs[best] < self.min_confidence:
+                return None
+            fields[head] = labels[best]
+
+        return fields
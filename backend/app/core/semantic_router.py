@@ -1,8 +1,88 @@
 """Semantic Router: AI-powered intent classification for V2 architecture."""
-from typing import Optional
-from pydantic import BaseModel, Field
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Set, Tuple
+import httpx
+from pydantic import BaseModel, Field, TypeAdapter
+from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.cache import LRUCache, SemanticCache
+from app.core.local_classifier import LocalIntentClassifier
+from app.models.request import TaxMemoRequest
+
+logger = logging.getLogger(__name__)
+
+# OpenAI connection pool: keep TLS connections alive across requests instead of
+# recycling them after httpx's 5s default expiry
+_OPENAI_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=60.0)
+_OPENAI_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Heuristic first pass: legal-form suffixes that make the company name unambiguous
+_CORPORATE_SUFFIX_RE = re.compile(
+    r"(?:\bb\.?v\.?|\bn\.?v\.?|\binc\.?|\bltd\.?|\bllc|\bcorp(?:oration)?\.?|\bgmbh|\bs\.?a\.?|\bplc)$",
+    re.IGNORECASE
+)
+
+_BV_SIGNAL_RE = re.compile(r"\bb\.?v\.?$|^bv$|besloten vennootschap", re.IGNORECASE)
+
+# Request fields described to the classifier, in prompt order
+_FIELD_SPECS = (
+    ("company_name", "Company name"),
+    ("company_type", "Company type"),
+    ("industry", "Industry"),
+    ("entry_goals", "Entry goals"),
+    ("tax_considerations", "Tax considerations"),
+    ("timeline_preference", "Timeline preference"),
+    ("urgency_level", "Urgency level"),
+    ("preferred_structure", "Preferred structure"),
+    ("additional_context", "Additional context"),
+)
+
+# Fallback keyword groups. Matching is by substring ("short" matches "short-term"),
+# so each group is compiled once into a single alternation
+_URGENT_KEYWORDS = ("asap", "urgent", "fast", "short", "1 month")
+_LOW_URGENCY_KEYWORDS = ("flexible", "long", "12 months")
+_MEDIUM_URGENCY_KEYWORDS = ("medium", "3 months", "6 months", "3-6 months")
+_TECH_INDUSTRY_KEYWORDS = ("software", "technology", "biotech", "engineering")
+_FINANCIAL_INDUSTRY_KEYWORDS = ("financial",)
+_HOLDING_TAX_KEYWORDS = ("participation exemption", "deelnemingsvrijstelling")
+
+
+def _keyword_re(*groups: Tuple[str, ...]) -> "re.Pattern":
+    """Compile keyword groups into one substring alternation."""
+    return re.compile("|".join(re.escape(word) for group in groups for word in group))
+
+
+_URGENT_RE = _keyword_re(_URGENT_KEYWORDS)
+_LOW_URGENCY_RE = _keyword_re(_LOW_URGENCY_KEYWORDS)
+_TECH_INDUSTRY_RE = _keyword_re(_TECH_INDUSTRY_KEYWORDS)
+_HOLDING_TAX_RE = _keyword_re(_HOLDING_TAX_KEYWORDS)
+# "B.V."/"BV" as a word or "besloten vennootschap", probed once over name and type
+_BV_RE = re.compile(r"\bb\.?v\.?\b|besloten vennootschap", re.IGNORECASE)
+
+# Timeline phrasings the heuristics classify reliably (HIGH, LOW and MEDIUM urgency)
+_KNOWN_TIMELINE_RE = _keyword_re(_URGENT_KEYWORDS, _LOW_URGENCY_KEYWORDS, _MEDIUM_URGENCY_KEYWORDS)
+
+# A negation just before a timeline keyword ("not urgent", "no fast track")
+# inverts its meaning, which the substring heuristics cannot read
+_NEGATED_TIMELINE_RE = re.compile(
+    r"\b(?:not|no|non|without)\b[\s-]*(?:so |too |very |that |a |the )?(?:"
+    + _KNOWN_TIMELINE_RE.pattern + ")"
+)
+
+# Industries the heuristics map to an industry_context
+_KNOWN_INDUSTRY_RE = _keyword_re(_TECH_INDUSTRY_KEYWORDS, _FINANCIAL_INDUSTRY_KEYWORDS)
+
+# Confidence each explicit signal contributes to the heuristic first pass
+_SIGNAL_WEIGHTS = {
+    "corporate_suffix": 0.3,
+    "company_type": 0.2,
+    "timeline": 0.2,
+    "industry": 0.2,
+}
 
 
 class UserIntent(BaseModel):
@@ -38,6 +118,50 @@ class UserIntent(BaseModel):
     )
 
 
+# Parses JSON-mode responses directly in pydantic-core
+_INTENT_ADAPTER = TypeAdapter(UserIntent)
+
+
+_SYSTEM_PROMPT = """Classify Netherlands market entry requests into UserIntent JSON.
+
+- is_holding: true if the user mentions a holding company/structure, participation exemption (deelnemingsvrijstelling), managing subsidiaries, or "holding"/"group" in the company name in a holding context.
+- must_be_bv: true if the company name has "B.V."/"BV"/"Besloten Vennootschap", the user says "Dutch Limited Liability Company" or asks for a Dutch BV, or is_holding is true. Generic "LLC", "Corporation", "Limited Liability" are NOT BV without explicit Dutch context.
+- entity_type: "BV" if must_be_bv; else "BRANCH" if speed/urgency is the priority; else "HOLDING" if is_holding; else null.
+- urgency: "HIGH" for ASAP/urgent/fast/short-term/1 month/immediate; "LOW" for flexible/long-term; else "MEDIUM" (3-6 months or normal).
+- industry_context: "TECH" for software/technology/biotech/engineering or R&D/research goals; "FINANCIAL" for financial services/banking/insurance; "GENERAL" for other industries; null if unclear.
+- intent: "SETUP" (establish an entity), "ADVISORY" (tax advice), or "COMPLIANCE" (compliance check).
+
+The input may end with a rule-based pre-classification: a hint only; confirm it or correct any field the input contradicts.
+Be conservative: only set flags to true if you're confident."""
+
+# Optional few-shot examples, sent ahead of the user message when enabled
+_FEW_SHOT_MESSAGES = (
+    {"role": "user", "content": "Company name: Nordic Apps B.V.\nIndustry: Software & Technology\nTimeline preference: ASAP (within 1 month)"},
+    {"role": "assistant", "content": '{"is_holding": false, "must_be_bv": true, "intent": "SETUP", "entity_type": "BV", "urgency": "HIGH", "industry_context": "TECH"}'},
+    {"role": "user", "content": "Company name: Atlas Group\nTax considerations: Participation exemption\nTimeline preference: Flexible"},
+    {"role": "assistant", "content": '{"is_holding": true, "must_be_bv": true, "intent": "SETUP", "entity_type": "BV", "urgency": "LOW", "industry_context": null}'},
+    {"role": "user", "content": "Company name: Acme LLC\nIndustry: Retail\nTimeline preference: Short-term (1-3 months)"},
+    {"role": "assistant", "content": '{"is_holding": false, "must_be_bv": false, "intent": "SETUP", "entity_type": "BRANCH", "urgency": "HIGH", "industry_context": "GENERAL"}'},
+)
+
+# Classification output is a ~60 token JSON object; cap completions to keep latency flat
+_MAX_COMPLETION_TOKENS = 120
+_SEED = 42  # Fixed seed with temperature 0 for repeatable classifications
+
+_BATCH_INSTRUCTIONS = """
+
+You will receive several numbered requests. Classify each request independently.
+Return ONLY a JSON object of the form {"results": [...]} where "results" holds exactly one
+UserIntent object per request, in the same order as the requests."""
+
+_SYSTEM_PROMPT_JSON = _SYSTEM_PROMPT + "\n\nReturn ONLY valid JSON matching the UserIntent schema."
+
+# Shared system messages; each call only adds its own user message
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+_SYSTEM_MESSAGE_JSON = {"role": "system", "content": _SYSTEM_PROMPT_JSON}
+_BATCH_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT + _BATCH_INSTRUCTIONS}
+
+
 class SemanticRouter:
     """
     V2 Semantic Router: Uses AI to classify user intent instead of regex.
@@ -50,179 +174,363 @@ class SemanticRouter:
     """
     
     def __init__(self):
-        """Initialize semantic router with OpenAI client."""
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        """Initialize semantic router with async OpenAI client and intent cache."""
+        self.openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.AsyncClient(limits=_OPENAI_LIMITS, timeout=_OPENAI_TIMEOUT)
+        )
         self.model = "gpt-4o-mini"  # Fast and cheap for classification
+        # Structured outputs API (OpenAI SDK 1.12+); detected once instead of per call
+        beta_completions = getattr(getattr(self.openai_client.beta, "chat", None), "completions", None)
+        self._has_structured = hasattr(beta_completions, "parse")
+        self._has_few_shot = settings.intent_few_shot_enabled
+        self.embedding_model = "text-embedding-3-small"  # Used for semantic cache lookups
+        
+        # Intent cache: exact match on the canonical request hash first, then embedding similarity
+        self.cache_enabled = settings.intent_cache_enabled
+        self._exact_cache = LRUCache(
+            maxsize=settings.intent_exact_cache_max_entries,
+            ttl_seconds=settings.intent_cache_ttl_seconds
+        )
+        # Semantic entries are partitioned by the request's own (must_be_bv, is_holding)
+        # heuristic verdict: names differing only in legal form ("Acme B.V." vs
+        # "Acme Ltd") embed almost identically and must never share an intent
+        self._caches: Dict[Tuple[bool, bool], SemanticCache] = {
+            (must_be_bv, is_holding): SemanticCache(
+                threshold=settings.intent_cache_similarity_threshold,
+                ttl_seconds=settings.intent_cache_ttl_seconds,
+                max_entries=settings.intent_cache_max_entries
+            )
+            for must_be_bv in (False, True)
+            for is_holding in (False, True)
+        }
+        
+        # Optional local ONNX classifier, consulted before the LLM when configured
+        self.local_classifier = LocalIntentClassifier(
+            settings.intent_onnx_model_dir,
+            min_confidence=settings.intent_onnx_min_confidence
+        )
+        
+        # Two-pass routing: heuristic results at or above this confidence skip the LLM
+        self.heuristic_confidence_threshold = settings.intent_heuristic_confidence_threshold
+        
+        # Micro-batching: concurrent LLM classifications share one OpenAI call
+        self.batch_window_seconds = settings.intent_batch_window_ms / 1000
+        self.batch_max_size = settings.intent_batch_max_size
+        self._pending: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
     
-    def get_intent(self, request_data: dict) -> UserIntent:
+    async def get_intent(self, request: TaxMemoRequest) -> UserIntent:
         """
-        Classify user intent from request data using AI.
+        Classify user intent from the request using AI.
+        
+        Async so the OpenAI round trip does not block the event loop.
         
         Args:
-            request_data: Dictionary containing request fields (company_name, industry, 
-                         company_type, entry_goals, tax_considerations, timeline_preference, etc.)
+            request: The tax memo request. Fields are read as attributes, so no
+                     intermediate dict (model_dump) is built per request.
         
         Returns:
             UserIntent object with classified intent
         """
+        # Pass 1: heuristics run on every request; confident results skip the API entirely
+        heuristic_intent = self._fallback_classification(request)
+        confidence = self._heuristic_confidence(request, heuristic_intent)
+        if confidence >= self.heuristic_confidence_threshold:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Intent resolved by heuristics (confidence {confidence:.2f})")
+            return heuristic_intent
+        
         # Build a natural language description of the user's request
-        user_input = self._build_user_input_text(request_data)
-        
-        system_prompt = """You are a tax intent classifier for the Netherlands market entry system.
-
-Your job is to analyze user input and classify their intent into structured JSON.
-
-CRITICAL RULES:
-1. **is_holding**: Set to true if:
-   - User explicitly mentions "holding company" or "holding structure"
-   - User mentions "participation exemption" or "deelnemingsvrijstelling"
-   - User's goals include holding/managing subsidiaries
-   - Company name contains "holding" or "group" (in holding context)
-
-2. **must_be_bv**: Set to true if:
-   - User explicitly names company with "B.V.", "BV", "Besloten Vennootschap"
-   - User says "Dutch Limited Liability Company" or similar Dutch entity synonyms
-   - User explicitly requests a Dutch BV structure
-   - is_holding is true (holdings need BV for tax treaties)
-   - NOTE: Generic terms like "LLC", "Corporation", "Limited Liability" do NOT mean BV unless explicitly Dutch context
-
-3. **entity_type**: 
-   - "BV" if must_be_bv is true
-   - "BRANCH" if user prioritizes speed/urgency and must_be_bv is false
-   - "HOLDING" if is_holding is true
-   - None if unclear
-
-4. **urgency**:
-   - "HIGH" if timeline mentions: ASAP, urgent, fast, short-term, 1 month, immediate
-   - "MEDIUM" if timeline is 3-6 months or normal
-   - "LOW" if timeline is flexible or long-term
-
-5. **industry_context**:
-   - "TECH" if industry is software, technology, biotech, engineering, or goals mention R&D/research
-   - "FINANCIAL" if industry is financial services, banking, insurance
-   - "GENERAL" for other industries
-   - None if unclear
-
-6. **intent**:
-   - "SETUP" if user wants to establish a new entity
-   - "ADVISORY" if user wants tax advice/consultation
-   - "COMPLIANCE" if user wants compliance check
-
-Return ONLY valid JSON matching the UserIntent schema. Be precise and conservative - only set flags to true if you're confident."""
+        user_input = self._build_user_input_text(request)
         
+        # Exact-match lookup runs first: no embedding or LLM call for repeated requests.
+        # Keyed on the built text, which holds every field the classification reads
+        cache_key = None
+        if self.cache_enabled:
+            cache_key = self._request_key(user_input)
+            cached = self._exact_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Intent cache exact hit")
+                return cached
+        
+        # Numeric company names (e.g. "Tech 2025 B.V.") are poorly separated by
+        # embeddings, so they skip the semantic layer and go to the LLM
+        use_semantic_cache = self.cache_enabled and not any(
+            ch.isdigit() for ch in (request.company_name or "")
+        )
+        
+        embedding = None
+        semantic_cache = self._caches[(heuristic_intent.must_be_bv, heuristic_intent.is_holding)]
+        if use_semantic_cache:
+            embedding = await self._embed(user_input)
+            if embedding is not None:
+                cached = semantic_cache.get(embedding)
+                if cached is not None:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Intent cache semantic hit (hit rate: {semantic_cache.hit_rate:.2%})")
+                    self._exact_cache.put(cache_key, cached)
+                    return cached
+        
+        # Local model: a few ms on CPU instead of an OpenAI round trip
+        local_fields = self.local_classifier.classify(user_input)
+        if local_fields is not None:
+            # Labels come from HEAD_LABELS, so they are valid by construction
+            intent = UserIntent.model_construct(**local_fields)
+            if cache_key is not None:
+                self._exact_cache.put(cache_key, intent)
+            return intent
+        
+        # Pass 2: the LLM confirms or corrects the heuristic result
+        prior = heuristic_intent.model_dump_json()
+        llm_input = f"{user_input}\n\nRule-based pre-classification (confirm or correct): {prior}"
         try:
-            # Try structured outputs API (available in OpenAI SDK 1.12+)
-            try:
-                response = self.openai_client.beta.chat.completions.parse(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_input}
-                    ],
-                    response_format=UserIntent,
-                    temperature=0.1  # Low temperature for consistent classification
-                )
-                intent = response.choices[0].message.parsed
-                return intent
-            except AttributeError:
-                # Fallback to JSON mode if structured outputs not available
-                import json
-                response = self.openai_client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt + "\n\nReturn ONLY valid JSON matching the UserIntent schema."},
-                        {"role": "user", "content": user_input}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
-                content = response.choices[0].message.content
-                # Parse JSON and create UserIntent
-                parsed_json = json.loads(content)
-                return UserIntent(**parsed_json)
-            
+            intent = await self._enqueue(llm_input)
         except Exception as e:
             # Fallback: If AI classification fails, use basic heuristics
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Semantic router AI classification failed: {e}. Using fallback heuristics.")
-            return self._fallback_classification(request_data)
+            return heuristic_intent
+        
+        # Only LLM classifications are cached; heuristic fallbacks are retried next time
+        if cache_key is not None:
+            self._exact_cache.put(cache_key, intent)
+            if embedding is not None:
+                semantic_cache.put(embedding, intent)
+        
+        return intent
     
-    def _build_user_input_text(self, request_data: dict) -> str:
-        """Build a natural language description from request data."""
-        parts = []
+    def cache_stats(self) -> dict:
+        """Intent cache statistics for the health endpoint."""
+        return {
+            "exact": self._exact_cache.stats(),
+            "semantic": self._semantic_stats()
+        }
+    
+    def _semantic_stats(self) -> dict:
+        """Semantic cache statistics summed over the legal-form partitions."""
+        entries = sum(len(cache) for cache in self._caches.values())
+        hits = sum(cache.hits for cache in self._caches.values())
+        misses = sum(cache.misses for cache in self._caches.values())
+        total = hits + misses
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0
+        }
+    
+    @staticmethod
+    def _request_key(user_input: str) -> str:
+        """Hash of the built user input text, used as the exact-match cache key."""
+        return hashlib.blake2b(user_input.encode("utf-8")).hexdigest()
+    
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed text for semantic cache lookups. Returns None if the call fails."""
+        try:
+            response = await self.openai_client.embeddings.create(
+                model=self.embedding_model,
+                input=text
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning(f"Intent cache embedding failed: {e}. Skipping semantic cache.")
+            return None
+    
+    async def _enqueue(self, user_input: str) -> UserIntent:
+        """Queue the user input for the next classification batch and await its result."""
+        loop = asyncio.get_running_loop()
+        if self._pending is None or self._batch_loop is not loop:
+            # (Re)start the batch worker on the current event loop
+            self._pending = asyncio.Queue()
+            self._batch_loop = loop
+            self._spawn(self._batch_worker(self._pending))
         
-        if request_data.get("company_name"):
-            parts.append(f"Company name: {request_data['company_name']}")
+        future = loop.create_future()
+        await self._pending.put((user_input, future))
+        return await future
+    
+    def _spawn(self, coro) -> None:
+        """Run a background task, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _batch_worker(self, queue: "asyncio.Queue[Tuple[str, asyncio.Future]]") -> None:
+        """Collect queued inputs for up to the batch window (or max size) and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window_seconds
+            while len(batch) < self.batch_max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without blocking collection of the next batch
+            self._spawn(self._dispatch_batch(batch))
+    
+    async def _dispatch_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Classify a batch and resolve each waiting future with its result or the error."""
+        inputs = [user_input for user_input, _ in batch]
+        try:
+            if len(inputs) == 1:
+                results = [await self._classify_with_llm(inputs[0])]
+            else:
+                results = await self._classify_batch_with_llm(inputs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
         
-        if request_data.get("company_type"):
-            parts.append(f"Company type: {request_data['company_type']}")
+        for (_, future), intent in zip(batch, results):
+            if not future.done():
+                future.set_result(intent)
+    
+    async def _classify_batch_with_llm(self, user_inputs: List[str]) -> List[UserIntent]:
+        """Classify several user inputs in one LLM call. Raises on API or parsing errors."""
+        numbered = "\n\n".join(
+            f"Request {i}:\n{user_input}" for i, user_input in enumerate(user_inputs, 1)
+        )
+        response = await self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=[_BATCH_SYSTEM_MESSAGE, {"role": "user", "content": numbered}],
+            response_format={"type": "json_object"},
+            temperature=0,
+            seed=_SEED,
+            max_tokens=_MAX_COMPLETION_TOKENS * len(user_inputs)
+        )
+        content = response.choices[0].message.content
+        results = json.loads(content).get("results")
+        if not isinstance(results, list) or len(results) != len(user_inputs):
+            raise ValueError(f"Batch classification returned {len(results) if isinstance(results, list) else 'no'} results for {len(user_inputs)} requests")
+        return [UserIntent(**item) for item in results]
+    
+    def _messages(self, system_message: dict, user_input: str) -> List[dict]:
+        """Chat messages for a single classification, with few-shot examples if enabled."""
+        user_message = {"role": "user", "content": user_input}
+        if self._has_few_shot:
+            return [system_message, *_FEW_SHOT_MESSAGES, user_message]
+        return [system_message, user_message]
+    
+    async def _classify_with_llm(self, user_input: str) -> UserIntent:
+        """Classify the user input with the LLM. Raises on API or parsing errors."""
+        if self._has_structured:
+            response = await self.openai_client.beta.chat.completions.parse(
+                model=self.model,
+                messages=self._messages(_SYSTEM_MESSAGE, user_input),
+                response_format=UserIntent,
+                temperature=0,
+                seed=_SEED,
+                max_tokens=_MAX_COMPLETION_TOKENS
+            )
+            return response.choices[0].message.parsed
         
-        if request_data.get("industry"):
-            parts.append(f"Industry: {request_data['industry']}")
+        # Fallback to JSON mode if structured outputs not available
+        response = await self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(_SYSTEM_MESSAGE_JSON, user_input),
+            response_format={"type": "json_object"},
+            temperature=0,
+            seed=_SEED,
+            max_tokens=_MAX_COMPLETION_TOKENS
+        )
+        content = response.choices[0].message.content
+        # Validate the JSON straight into UserIntent (no intermediate dict)
+        return _INTENT_ADAPTER.validate_json(content)
+    
+    def _heuristic_confidence(self, request: TaxMemoRequest, intent: UserIntent) -> float:
+        """
+        Score how far the heuristic classification can be trusted (0.0 - 0.9).
+        
+        Each explicit signal adds its weight from _SIGNAL_WEIGHTS. Conflicts the
+        heuristics cannot resolve score 0.0 so the request goes to the LLM:
+        free-text additional context, fields the heuristics do not read
+        (urgency level, preferred structure), a BV verdict that disagrees with
+        the legal form stated in the company name or type, or a timeline whose
+        keywords conflict or are negated.
+        """
+        if (request.additional_context or "").strip():
+            return 0.0
+        if request.urgency_level or request.preferred_structure:
+            return 0.0
         
-        if request_data.get("entry_goals"):
-            goals = ", ".join(request_data["entry_goals"])
-            parts.append(f"Entry goals: {goals}")
+        company_name = (request.company_name or "").strip()
+        company_type = (request.company_type or "").strip()
         
-        if request_data.get("tax_considerations"):
-            tax = ", ".join([str(tc) for tc in request_data["tax_considerations"]])
-            parts.append(f"Tax considerations: {tax}")
+        # The heuristics use loose substring probes; only trust them when their BV
+        # verdict agrees with the explicit legal form in the name or company type
+        explicit_bv = bool(_BV_SIGNAL_RE.search(company_name) or _BV_SIGNAL_RE.search(company_type))
+        if intent.must_be_bv != (explicit_bv or intent.is_holding):
+            return 0.0
         
-        if request_data.get("timeline_preference"):
-            parts.append(f"Timeline preference: {request_data['timeline_preference']}")
+        confidence = 0.0
+        if _CORPORATE_SUFFIX_RE.search(company_name):
+            confidence += _SIGNAL_WEIGHTS["corporate_suffix"]
+        if company_type:
+            confidence += _SIGNAL_WEIGHTS["company_type"]
         
-        if request_data.get("urgency_level"):
-            parts.append(f"Urgency level: {request_data['urgency_level']}")
+        timeline = (request.timeline_preference or "").lower()
+        if _KNOWN_TIMELINE_RE.search(timeline):
+            # Urgent and low-urgency keywords together, or a negated keyword:
+            # the heuristic urgency is a guess, so let the LLM decide
+            if (_URGENT_RE.search(timeline) and _LOW_URGENCY_RE.search(timeline)) or _NEGATED_TIMELINE_RE.search(timeline):
+                return 0.0
+            confidence += _SIGNAL_WEIGHTS["timeline"]
         
-        if request_data.get("preferred_structure"):
-            parts.append(f"Preferred structure: {request_data['preferred_structure']}")
+        industry = (request.industry or "").lower()
+        if _KNOWN_INDUSTRY_RE.search(industry):
+            confidence += _SIGNAL_WEIGHTS["industry"]
         
-        if request_data.get("additional_context"):
-            parts.append(f"Additional context: {request_data['additional_context']}")
+        return confidence
+    
+    def _build_user_input_text(self, request: TaxMemoRequest) -> str:
+        """Build a natural language description from request data."""
+        parts = []
+        for field, label in _FIELD_SPECS:
+            value = getattr(request, field)
+            if value:
+                if isinstance(value, list):
+                    value = ", ".join([str(item) for item in value])
+                parts.append(f"{label}: {value}")
         
         return "\n".join(parts) if parts else "User request for Netherlands market entry."
     
-    def _fallback_classification(self, request_data: dict) -> UserIntent:
+    def _fallback_classification(self, request: TaxMemoRequest) -> UserIntent:
         """
         Fallback classification using basic heuristics if AI fails.
         This maintains backward compatibility.
         """
-        company_name = (request_data.get("company_name") or "").lower()
-        company_type = (request_data.get("company_type") or "").lower()
-        industry = (request_data.get("industry") or "").lower()
-        goals = [g.lower() for g in (request_data.get("entry_goals") or [])]
-        tax_considerations = [str(tc).lower() for tc in (request_data.get("tax_considerations") or [])]
-        timeline = (request_data.get("timeline_preference") or "").lower()
-        additional_context = (request_data.get("additional_context") or "").lower()
-        
-        all_tax_text = " ".join(tax_considerations) + " " + additional_context
+        company_name = (request.company_name or "").lower()
+        company_type = (request.company_type or "").lower()
+        industry = (request.industry or "").lower()
+        goals_text = " ".join(request.entry_goals or []).lower()
+        timeline = (request.timeline_preference or "").lower()
+        additional_context = (request.additional_context or "").lower()
+        tax_considerations = request.tax_considerations or []
         
         # Basic heuristics (similar to V1 but simplified)
         is_holding = (
             "holding" in company_type or
             "holding" in company_name or
-            "participation exemption" in all_tax_text or
-            "deelnemingsvrijstelling" in all_tax_text
+            bool(_HOLDING_TAX_RE.search(additional_context)) or
+            any(_HOLDING_TAX_RE.search(str(tc).lower()) for tc in tax_considerations)
         )
         
-        must_be_bv = (
-            "b.v" in company_name or
-            "bv" in company_name or
-            "b.v." in company_name or
-            "besloten vennootschap" in company_type or
-            is_holding
-        )
+        must_be_bv = is_holding or bool(_BV_RE.search(f"{company_name} {company_type}"))
         
         urgency = "MEDIUM"
-        if any(word in timeline for word in ["asap", "urgent", "fast", "short", "1 month"]):
+        if _URGENT_RE.search(timeline):
             urgency = "HIGH"
-        elif any(word in timeline for word in ["flexible", "long", "12 months"]):
+        elif _LOW_URGENCY_RE.search(timeline):
             urgency = "LOW"
         
         industry_context = None
-        if ("software" in industry or "technology" in industry or "biotech" in industry or 
-            "engineering" in industry or "r&d" in " ".join(goals)):
+        if _TECH_INDUSTRY_RE.search(industry) or "r&d" in goals_text:
             industry_context = "TECH"
         elif "financial" in industry:
             industry_context = "FINANCIAL"
@@ -235,7 +543,8 @@ Return ONLY valid JSON matching the UserIntent schema. Be precise and conservati
         elif urgency == "HIGH" and not must_be_bv:
             entity_type = "BRANCH"
         
-        return UserIntent(
+        # Every field is built above from fixed literals; skip pydantic validation
+        return UserIntent.model_construct(
             is_holding=is_holding,
             must_be_bv=must_be_bv,
             intent="SETUP",
@@ -1,6 +1,7 @@
 """FastAPI entrypoint for Tax Memo Orchestrator."""
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from app.models.request import TaxMemoRequest
 from app.models.response import (
     MemoResponse,
@@ -22,7 +23,9 @@ from app.core.orchestrator import Orchestrator
 from app.services.rag_engine import RAGEngine
 from app.services.qdrant import QdrantService
 from app.core.config import settings
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Callable, Optional
+import asyncio
+import json
 import logging
 
 # Configure logging
@@ -333,7 +336,8 @@ async def health_check():
         },
         "openai": {
             "configured": bool(env_openai_key)
-        }
+        },
+        "intent_cache": orchestrator.semantic_router.cache_stats()
     }
     
     # Diagnostic: Check if environment variable is set
@@ -346,7 +350,7 @@ async def health_check():
     
     # Test Qdrant connection
     try:
-        if qdrant_service._ensure_client():
+        if await qdrant_service.aensure_client(probe=True):
             health_status["qdrant"]["connected"] = True
             health_status["qdrant"]["status"] = "connected"
         else:
@@ -374,6 +378,80 @@ async def health_check():
     return health_status
 
 
+async def build_memo(
+    request: TaxMemoRequest,
+    progress: Optional[Callable[[str], None]] = None
+) -> MemoResponse:
+    """
+    Plan, research and generate a memo for the request.
+    
+    Args:
+        request: TaxMemoRequest with company and entry details
+        progress: Called with a short status message as each stage starts and
+            each section finishes (used by /generate-memo/stream)
+    
+    Returns:
+        MemoResponse with 13 sections of market entry analysis
+    """
+    def report(message: str):
+        if progress:
+            progress(message)
+    
+    logger.info(f"Generating memo for company: {request.company_name}")
+    
+    # Step 1: Plan research tasks
+    report("Analyzing your company and classifying intent...")
+    tasks = await orchestrator.plan_tasks(request)
+    logger.info(f"Planned {len(tasks)} research tasks")
+    
+    # Step 2: Prepare user context
+    user_context = {
+        "company_name": request.company_name,
+        "industry": request.industry,
+        "company_type": request.company_type,
+        "entry_goals": request.entry_goals or [],
+        "selected_legal_topics": request.selected_legal_topics or [],
+        "current_revenue": request.current_revenue,
+        "projected_revenue": request.projected_revenue,
+        "employee_count": request.employee_count,
+        "planned_employees": request.planned_employees,
+        "timeline_preference": request.timeline_preference,
+        "budget_range": request.budget_range,
+        "preferred_structure": request.preferred_structure,
+        "key_products_services": request.key_products_services or []
+    }
+    
+    # Step 3: Generate all sections using RAG
+    logger.info(f"Starting RAG generation for {len(tasks)} tasks...")
+    report(f"Researching {len(tasks)} topics...")
+    finished = 0
+    
+    def task_done(task):
+        nonlocal finished
+        finished += 1
+        report(f"Finished {task.task_name} ({finished}/{len(tasks)})")
+    
+    sections = await rag_engine.agenerate_memo_sections(tasks, user_context, on_task_done=task_done)
+    logger.info(f"Generated {len(sections)} sections")
+    logger.info(f"Section keys: {list(sections.keys())}")
+    
+    # Debug: Log section structures with full content
+    for key, value in sections.items():
+        if isinstance(value, dict):
+            logger.info(f"Section '{key}': keys={list(value.keys())}")
+            logger.info(f"Section '{key}' content preview: {str(value)[:500]}")
+        else:
+            logger.info(f"Section '{key}': type={type(value).__name__}, value={str(value)[:200]}")
+    
+    # Step 4: Map to response model
+    logger.info("Mapping sections to response model...")
+    report("Assembling your memo...")
+    response = map_sections_to_response(sections, request)
+    logger.info("Response mapping complete")
+    
+    return response
+
+
 @app.post("/generate-memo", response_model=MemoResponse)
 async def generate_memo(request: TaxMemoRequest) -> MemoResponse:
     """
@@ -392,55 +470,54 @@ async def generate_memo(request: TaxMemoRequest) -> MemoResponse:
         MemoResponse with 13 sections of market entry analysis
     """
     try:
-        logger.info(f"Generating memo for company: {request.company_name}")
-        
-        # Step 1: Plan research tasks
-        tasks = orchestrator.plan_tasks(request)
-        logger.info(f"Planned {len(tasks)} research tasks")
-        
-        # Step 2: Prepare user context
-        user_context = {
-            "company_name": request.company_name,
-            "industry": request.industry,
-            "company_type": request.company_type,
-            "entry_goals": request.entry_goals or [],
-            "selected_legal_topics": request.selected_legal_topics or [],
-            "current_revenue": request.current_revenue,
-            "projected_revenue": request.projected_revenue,
-            "employee_count": request.employee_count,
-            "planned_employees": request.planned_employees,
-            "timeline_preference": request.timeline_preference,
-            "budget_range": request.budget_range,
-            "preferred_structure": request.preferred_structure,
-            "key_products_services": request.key_products_services or []
-        }
-        
-        # Step 3: Generate all sections using RAG
-        logger.info(f"Starting RAG generation for {len(tasks)} tasks...")
-        sections = rag_engine.generate_memo_sections(tasks, user_context)
-        logger.info(f"Generated {len(sections)} sections")
-        logger.info(f"Section keys: {list(sections.keys())}")
-        
-        # Debug: Log section structures with full content
-        for key, value in sections.items():
-            if isinstance(value, dict):
-                logger.info(f"Section '{key}': keys={list(value.keys())}")
-                logger.info(f"Section '{key}' content preview: {str(value)[:500]}")
-            else:
-                logger.info(f"Section '{key}': type={type(value).__name__}, value={str(value)[:200]}")
-        
-        # Step 4: Map to response model
-        logger.info("Mapping sections to response model...")
-        response = map_sections_to_response(sections, request)
-        logger.info("Response mapping complete")
-        
-        return response
+        return await build_memo(request)
     
     except Exception as e:
         logger.error(f"Error generating memo: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate memo: {str(e)}")
 
 
+@app.post("/generate-memo/stream")
+async def generate_memo_stream(request: TaxMemoRequest) -> StreamingResponse:
+    """
+    Generate a memo, streaming progress as newline-delimited JSON.
+    
+    Each line is one event: {"status": "..."} while the memo is being built,
+    then a final {"memo": {...}} (same body as /generate-memo) or
+    {"error": "..."}.
+    
+    Args:
+        request: TaxMemoRequest with company and entry details
+    
+    Returns:
+        application/x-ndjson stream of progress events
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def run() -> MemoResponse:
+        try:
+            return await build_memo(request, progress=lambda message: events.put_nowait({"status": message}))
+        finally:
+            events.put_nowait(None)  # End of progress events
+    
+    async def stream() -> AsyncIterator[str]:
+        memo_task = asyncio.create_task(run())
+        try:
+            while (event := await events.get()) is not None:
+                yield json.dumps(event) + "\n"
+            
+            response = await memo_task
+            yield json.dumps({"memo": response.model_dump(mode="json", by_alias=True)}) + "\n"
+        except Exception as e:
+            logger.error(f"Error generating memo: {str(e)}")
+            yield json.dumps({"error": f"Failed to generate memo: {str(e)}"}) + "\n"
+        finally:
+            # Client disconnected mid-stream: stop generating
+            memo_task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
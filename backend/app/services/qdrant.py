@@ -1,13 +1,84 @@
 """Qdrant Vector DB connection and search service."""
-from typing import List, Dict, Any, Optional, Union
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.models import Filter, FieldCondition, MatchValue, QuantizationSearchParams, SearchParams
 from app.core.config import settings
-from openai import OpenAI
+from app.core.cache import LRUCache, SemanticCache
+from openai import AsyncOpenAI, OpenAI
+import httpx
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDING_MODEL = "text-embedding-3-small"
+_EMBEDDING_BATCH_SIZE = 2048  # Max inputs per embeddings API request
+
+# The collection keeps int8 quantized vectors (see ingest_data.py): scan those,
+# then rescore 2x the requested candidates with the original float32 vectors.
+# Ignored by collections without quantization.
+_QUANTIZATION_PARAMS = QuantizationSearchParams(rescore=True, oversampling=2.0)
+
+# One OpenAI client pair per process, so every QdrantService shares the same
+# keep-alive connection pool instead of re-handshaking TLS per instance.
+# HTTP/1.1 (httpx default): parallel embedding calls each get their own connection.
+_OPENAI_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+_OPENAI = OpenAI(api_key=settings.openai_api_key, http_client=httpx.Client(limits=_OPENAI_LIMITS))
+_ASYNC_OPENAI = AsyncOpenAI(api_key=settings.openai_api_key, http_client=httpx.AsyncClient(limits=_OPENAI_LIMITS))
+
+# Fans out the Qdrant lookups of search_many (sync callers)
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="qdrant-search")
+
+# gRPC status codes worth retrying (grpc ships with qdrant-client)
+try:
+    import grpc
+    _RETRYABLE_GRPC_CODES = {grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED}
+except ImportError:  # pragma: no cover
+    grpc = None
+    _RETRYABLE_GRPC_CODES = set()
+
+
+def _is_transient(error: Exception) -> bool:
+    """True for timeouts, connection errors and 5xx responses, which are worth a retry."""
+    if isinstance(error, ResponseHandlingException):
+        error = error.source
+    if isinstance(error, (httpx.TimeoutException, httpx.ConnectError)):
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code is not None and error.status_code >= 500
+    if grpc is not None and isinstance(error, grpc.RpcError):
+        return error.code() in _RETRYABLE_GRPC_CODES
+    return False
+
+
+def _retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+    cap = min(
+        settings.qdrant_retry_backoff_seconds * (2 ** attempt),
+        settings.qdrant_retry_backoff_max_seconds
+    )
+    return random.uniform(0, cap)
+
+
+# Process-wide Qdrant client, created by the first successful _ensure_client()
+_shared_client: Optional[QdrantClient] = None
+_client_lock = threading.Lock()
+
+_CONTEXT_TEMPLATE = "Context {0} (Source: {1}):\n{2}"
+
+# Query embeddings keyed on the exact query text, shared by all QdrantService
+# instances. Values are read-only float32 arrays, so callers cannot mutate them.
+_embedding_cache = LRUCache(
+    maxsize=settings.query_embedding_cache_max_entries,
+    ttl_seconds=settings.query_embedding_cache_ttl_seconds
+)
+
 
 class QdrantService:
     """Service for interacting with Qdrant vector database."""
@@ -15,8 +86,19 @@ class QdrantService:
     def __init__(self):
         """Initialize Qdrant client with lazy connection."""
         self.client = None
+        self.async_client = None  # AsyncQdrantClient for asearch/asearch_many
         self.collection_name = "netherlands_pilot"
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        self.openai_client = _OPENAI
+        self.async_openai_client = _ASYNC_OPENAI
+        
+        # Search results for near-identical query vectors, one cache per (limit, country, year)
+        self.search_cache_enabled = settings.search_cache_enabled
+        self._search_caches: Dict[Tuple[int, str, str], SemanticCache] = {}
+        self._filtered_counts: Dict[Tuple[str, str], int] = {}  # (country, year) -> approximate point count
+        
+        # Reconnect backoff after failures (see _record_failure)
+        self._failure_count = 0
+        self._retry_after = 0.0
         
         # Store connection parameters for lazy initialization
         self.qdrant_url = settings.qdrant_url
@@ -26,63 +108,114 @@ class QdrantService:
         logger.info(f"Qdrant configured - URL: {self.qdrant_url[:50]}..." if len(self.qdrant_url) > 50 else f"Qdrant configured - URL: {self.qdrant_url}")
         logger.info(f"Qdrant API Key: {'Set' if self.qdrant_api_key else 'Not set'}")
     
-    def _ensure_client(self):
-        """Lazy initialization of Qdrant client with better error handling."""
+    def _ensure_client(self, probe: Optional[bool] = None):
+        """
+        Lazy initialization of the shared Qdrant client with better error handling.
+        
+        Args:
+            probe: Test the new connection with get_collections() before using it
+                   (default: QDRANT_PROBE_CONNECTION). Without the probe, the first
+                   real query surfaces connection errors.
+        """
+        global _shared_client
         if self.client is not None:
             return True
         
-        try:
-            logger.info(f"Initializing Qdrant client to: {self.qdrant_url}")
-            
-            # Create client with timeout settings for cloud environments
-            if self.qdrant_api_key:
-                self.client = QdrantClient(
-                    url=self.qdrant_url,
-                    api_key=self.qdrant_api_key,
-                    timeout=30.0  # 30 second timeout for cloud
-                )
-            else:
-                self.client = QdrantClient(
-                    url=self.qdrant_url,
-                    timeout=30.0  # 30 second timeout for cloud
-                )
+        # Recent failure: don't wait on another connect timeout until the backoff expires
+        if time.monotonic() < self._retry_after:
+            logger.debug("Qdrant reconnect skipped (backing off after a recent failure)")
+            return False
+        
+        if probe is None:
+            probe = settings.qdrant_probe_connection
+        
+        with _client_lock:
+            if _shared_client is not None:
+                self.client = _shared_client
+                return True
             
-            # Test connection with a lightweight operation
             try:
-                collections = self.client.get_collections()
-                logger.info(f"✅ Qdrant connection successful. Collections: {[c.name for c in collections.collections]}")
+                logger.info(f"Initializing Qdrant client to: {self.qdrant_url}")
+                
+                # Create client with timeout settings for cloud environments
+                self.client = QdrantClient(**self._client_kwargs())
+                
+                # Test connection with a lightweight operation
+                if probe:
+                    try:
+                        collections = self.client.get_collections()
+                        # Only build the collection name list when it will be logged
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info(f"✅ Qdrant connection successful. Collections: {[c.name for c in collections.collections]}")
+                        self._failure_count = 0
+                    except Exception as e:
+                        logger.error(f"❌ Qdrant connection test failed: {str(e)}")
+                        logger.error(f"   URL: {self.qdrant_url}")
+                        logger.error(f"   Error type: {type(e).__name__}")
+                        self.client = None
+                        self._record_failure()
+                        return False
+                
+                _shared_client = self.client
                 return True
+                    
             except Exception as e:
-                logger.error(f"❌ Qdrant connection test failed: {str(e)}")
+                logger.error(f"❌ Failed to create Qdrant client: {str(e)}")
                 logger.error(f"   URL: {self.qdrant_url}")
                 logger.error(f"   Error type: {type(e).__name__}")
                 self.client = None
+                self._record_failure()
                 return False
-                
-        except Exception as e:
-            logger.error(f"❌ Failed to create Qdrant client: {str(e)}")
-            logger.error(f"   URL: {self.qdrant_url}")
-            logger.error(f"   Error type: {type(e).__name__}")
-            self.client = None
-            return False
+    
+    async def aensure_client(self, probe: Optional[bool] = None) -> bool:
+        """
+        _ensure_client for async callers.
+        
+        Connecting (and the optional get_collections probe) is blocking I/O, so
+        it runs on a worker thread instead of stalling the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._ensure_client, probe)
+    
+    def _record_failure(self):
+        """Start (or double) the reconnect backoff after a connection or search failure."""
+        self._failure_count += 1
+        backoff = min(
+            settings.qdrant_reconnect_backoff_seconds * (2 ** (self._failure_count - 1)),
+            settings.qdrant_reconnect_backoff_max_seconds
+        )
+        self._retry_after = time.monotonic() + backoff
+    
+    def _reset_client(self):
+        """Drop the Qdrant client (and the shared one, if it is the same) to force reconnection."""
+        global _shared_client
+        with _client_lock:
+            if _shared_client is self.client:
+                _shared_client = None
+        self.client = None
+        self._record_failure()
     
     def search(
         self,
         query: str,
         limit: int = 5,
         country: str = "netherlands",
-        year: str = "2025"
+        year: str = "2025",
+        hnsw_ef: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search the vector database with mandatory metadata filters.
         
         CRITICAL: Must always filter by country="netherlands" and year="2025" for V1.
+        The filters are applied when QDRANT_METADATA_FILTERS is enabled (the
+        collection must have been ingested with the country/year metadata).
         
         Args:
             query: Search query text
             limit: Number of results to return (default: 5)
             country: Country filter (default: "netherlands")
             year: Year filter (default: "2025")
+            hnsw_ef: HNSW search beam width (default: QDRANT_HNSW_EF)
         
         Returns:
             List of search results with metadata
@@ -96,37 +229,37 @@ class QdrantService:
             # Convert query text to embedding vector
             # Qdrant search requires a query vector, not text
             query_vector = self._text_to_embedding(query)
+            if query_vector is None:
+                # No point running an ANN search without a real query vector
+                return []
+            
+            search_cache = self._search_cache(limit, country, year)
+            if search_cache is not None:
+                cached = search_cache.get(query_vector)
+                if cached is not None:
+                    logger.debug(f"Qdrant search cache hit (hit rate: {search_cache.hit_rate:.2%})")
+                    return list(cached)
+            
+            # Metadata pre-filter (country/year) when QDRANT_METADATA_FILTERS is enabled
+            query_filter = self._metadata_filter(country, year)
+            filtered_count = self._filtered_count(query_filter, country, year)
             
             # Perform vector search using query_points (correct API for qdrant-client 1.10+)
-            # No metadata filters for V1 - search all documents
             # query_points accepts vector directly as a list
-            search_results = self.client.query_points(
+            search_results = self._query_points(
                 collection_name=self.collection_name,
                 query=query_vector,  # Pass vector directly as list
-                limit=limit
+                query_filter=query_filter,
+                limit=limit,
+                search_params=self._search_params(hnsw_ef, filtered_count)
             )
             
-            # Format results
-            # query_points returns QueryResponse with points attribute
-            results = []
-            if hasattr(search_results, 'points'):
-                # QueryResponse format
-                for point in search_results.points:
-                    results.append({
-                        "score": getattr(point, 'score', 0.0) if hasattr(point, 'score') else 0.0,
-                        "payload": getattr(point, 'payload', {}) if hasattr(point, 'payload') else {},
-                        "id": getattr(point, 'id', None) if hasattr(point, 'id') else None
-                    })
-            else:
-                # Fallback: try iterating directly
-                for result in search_results:
-                    results.append({
-                        "score": result.score,
-                        "payload": result.payload,
-                        "id": result.id
-                    })
+            results = self._format_points(search_results)
+            self._failure_count = 0
             
             logger.info(f"Qdrant search successful: {len(results)} results for query: {query[:50]}...")
+            if search_cache is not None and results:
+                search_cache.put(query_vector, results)
             return results
         
         except Exception as e:
@@ -137,9 +270,383 @@ class QdrantService:
             logger.warning("System will continue without Qdrant context (using LLM knowledge only)")
             
             # Reset client to force reconnection on next attempt
-            self.client = None
+            self._reset_client()
             return []
     
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        country: str = "netherlands",
+        year: str = "2025",
+        hnsw_ef: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search the vector database for several queries in parallel (sync callers).
+        
+        All queries are embedded in one batched OpenAI call; the Qdrant lookups
+        that miss the search cache then run on a shared thread pool.
+        
+        Args:
+            queries: Search query texts
+            limit: Number of results to return per query (default: 5)
+            country: Country filter (default: "netherlands")
+            year: Year filter (default: "2025")
+            hnsw_ef: HNSW search beam width (default: QDRANT_HNSW_EF)
+        
+        Returns:
+            One list of search results per query, in query order. A failed
+            lookup yields an empty list, like search().
+        """
+        if not queries:
+            return []
+        
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        try:
+            # Lazy initialization - connect on first use
+            if not self._ensure_client():
+                logger.warning("Qdrant client not available. Returning empty results.")
+                return [[] for _ in queries]
+            
+            query_vectors = self.embed_batch(queries)
+            search_cache = self._search_cache(limit, country, year)
+            query_filter = self._metadata_filter(country, year)
+            search_params = self._search_params(hnsw_ef, self._filtered_count(query_filter, country, year))
+            
+            futures = []  # (position, future) for the lookups sent to Qdrant
+            for i, query_vector in enumerate(query_vectors):
+                if query_vector is None:
+                    results[i] = []  # Embedding failed: skip the Qdrant round trip
+                    continue
+                cached = search_cache.get(query_vector) if search_cache is not None else None
+                if cached is not None:
+                    results[i] = list(cached)
+                    continue
+                futures.append((i, _SEARCH_EXECUTOR.submit(
+                    self._query_points,
+                    collection_name=self.collection_name,
+                    query=query_vector,
+                    query_filter=query_filter,
+                    limit=limit,
+                    search_params=search_params
+                )))
+            
+            failed = False
+            for i, future in futures:
+                try:
+                    results[i] = self._format_points(future.result())
+                except Exception as e:
+                    logger.error(f"Qdrant search error: {str(e)}")
+                    logger.error(f"   Error type: {type(e).__name__}")
+                    failed = True
+                    results[i] = []
+                    continue
+                if search_cache is not None and results[i]:
+                    search_cache.put(query_vectors[i], results[i])
+            
+            if failed:
+                logger.warning("System will continue without Qdrant context (using LLM knowledge only)")
+                # Reset client to force reconnection on next attempt
+                self._reset_client()
+            else:
+                self._failure_count = 0
+            
+            logger.info(f"Qdrant search: {len(queries)} queries, {len(futures)} sent to Qdrant")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Qdrant search error: {str(e)}")
+            logger.error(f"   Error type: {type(e).__name__}")
+            logger.warning("System will continue without Qdrant context (using LLM knowledge only)")
+            self._reset_client()
+            return [result if result is not None else [] for result in results]
+    
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        country: str = "netherlands",
+        year: str = "2025",
+        hnsw_ef: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of search() that does not block the event loop.
+        
+        Args:
+            query: Search query text
+            limit: Number of results to return (default: 5)
+            country: Country filter (default: "netherlands")
+            year: Year filter (default: "2025")
+            hnsw_ef: HNSW search beam width (default: QDRANT_HNSW_EF)
+        
+        Returns:
+            List of search results with metadata
+        """
+        return (await self.asearch_many([query], limit=limit, country=country, year=year, hnsw_ef=hnsw_ef))[0]
+    
+    async def asearch_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        country: str = "netherlands",
+        year: str = "2025",
+        hnsw_ef: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search the vector database for several queries concurrently.
+        
+        All queries are embedded in one batched OpenAI call, then the Qdrant
+        lookups run in parallel, so the wall time is roughly that of the
+        slowest lookup instead of the sum of all of them.
+        
+        Args:
+            queries: Search query texts
+            limit: Number of results to return per query (default: 5)
+            country: Country filter (default: "netherlands")
+            year: Year filter (default: "2025")
+            hnsw_ef: HNSW search beam width (default: QDRANT_HNSW_EF)
+        
+        Returns:
+            One list of search results per query, in query order. A failed
+            lookup yields an empty list, like search().
+        """
+        if not queries:
+            return []
+        
+        if not self._ensure_async_client():
+            logger.warning("Qdrant async client not available. Returning empty results.")
+            return [[] for _ in queries]
+        
+        query_vectors = await self.aembed_batch(queries)
+        search_cache = self._search_cache(limit, country, year)
+        query_filter = self._metadata_filter(country, year)
+        
+        filtered_count = None
+        if query_filter is not None:
+            filtered_count = self._filtered_counts.get((country, year))
+            if filtered_count is None:
+                try:
+                    filtered_count = (await self.async_client.count(
+                        collection_name=self.collection_name,
+                        count_filter=query_filter,
+                        exact=False
+                    )).count
+                    self._filtered_counts[(country, year)] = filtered_count
+                except Exception as e:
+                    logger.warning(f"Qdrant filtered count failed: {str(e)}. Using HNSW search.")
+        search_params = self._search_params(hnsw_ef, filtered_count)
+        
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        pending = []  # positions that need a Qdrant lookup
+        for i, query_vector in enumerate(query_vectors):
+            if query_vector is None:
+                results[i] = []  # Embedding failed: skip the Qdrant round trip
+                continue
+            cached = search_cache.get(query_vector) if search_cache is not None else None
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending.append(i)
+        
+        responses = await asyncio.gather(
+            *[
+                self._aquery_points(
+                    collection_name=self.collection_name,
+                    query=query_vectors[i],
+                    query_filter=query_filter,
+                    limit=limit,
+                    search_params=search_params
+                )
+                for i in pending
+            ],
+            return_exceptions=True
+        )
+        
+        failed = False
+        for i, response in zip(pending, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Qdrant search error: {str(response)}")
+                logger.error(f"   Error type: {type(response).__name__}")
+                failed = True
+                results[i] = []
+                continue
+            
+            results[i] = self._format_points(response)
+            if search_cache is not None and results[i]:
+                search_cache.put(query_vectors[i], results[i])
+        
+        if failed:
+            logger.warning("System will continue without Qdrant context (using LLM knowledge only)")
+            # Reset client to force reconnection on next attempt
+            await self._areset_async_client()
+        elif pending:
+            self._failure_count = 0
+        
+        logger.info(f"Qdrant async search: {len(queries)} queries, {len(pending)} sent to Qdrant")
+        return results
+    
+    def _ensure_async_client(self) -> bool:
+        """
+        Lazy initialization of the AsyncQdrantClient, honouring the reconnect backoff.
+        
+        Creating the client does not touch the network, so this is safe to call
+        from the event loop.
+        """
+        if self.async_client is not None:
+            return True
+        
+        # Recent failure: don't wait on another connect timeout until the backoff expires
+        if time.monotonic() < self._retry_after:
+            logger.debug("Qdrant async reconnect skipped (backing off after a recent failure)")
+            return False
+        
+        try:
+            self.async_client = AsyncQdrantClient(**self._client_kwargs())
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to create async Qdrant client: {str(e)}")
+            logger.error(f"   Error type: {type(e).__name__}")
+            self._record_failure()
+            return False
+    
+    async def _areset_async_client(self):
+        """Close and drop the async client to force reconnection, like _reset_client()."""
+        client, self.async_client = self.async_client, None
+        self._record_failure()
+        if client is None:
+            return
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Closing the async Qdrant client failed: {str(e)}")
+    
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Connection arguments shared by the sync and async Qdrant clients."""
+        kwargs = {
+            "url": self.qdrant_url,
+            "timeout": settings.qdrant_timeout_seconds
+        }
+        if self.qdrant_api_key:
+            kwargs["api_key"] = self.qdrant_api_key
+        if settings.qdrant_prefer_grpc:
+            # gRPC multiplexes concurrent searches over one HTTP/2 connection;
+            # TLS follows the URL scheme
+            kwargs["prefer_grpc"] = True
+            kwargs["grpc_port"] = settings.qdrant_grpc_port
+        return kwargs
+    
+    def _query_points(self, **kwargs):
+        """client.query_points with jittered-backoff retries on transient failures."""
+        attempts = max(1, settings.qdrant_search_attempts)
+        for attempt in range(attempts):
+            try:
+                return self.client.query_points(**kwargs)
+            except Exception as e:
+                if attempt == attempts - 1 or not _is_transient(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Qdrant search failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+    
+    async def _aquery_points(self, **kwargs):
+        """async_client.query_points with jittered-backoff retries on transient failures."""
+        attempts = max(1, settings.qdrant_search_attempts)
+        for attempt in range(attempts):
+            try:
+                return await self.async_client.query_points(**kwargs)
+            except Exception as e:
+                if attempt == attempts - 1 or not _is_transient(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Qdrant search failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _format_points(search_results) -> List[Dict[str, Any]]:
+        """Convert a query_points response into result dictionaries."""
+        # query_points returns QueryResponse with points attribute
+        results = []
+        if hasattr(search_results, 'points'):
+            # QueryResponse format
+            for point in search_results.points:
+                results.append({
+                    "score": getattr(point, 'score', 0.0) if hasattr(point, 'score') else 0.0,
+                    "payload": getattr(point, 'payload', {}) if hasattr(point, 'payload') else {},
+                    "id": getattr(point, 'id', None) if hasattr(point, 'id') else None
+                })
+        else:
+            # Fallback: try iterating directly
+            for result in search_results:
+                results.append({
+                    "score": result.score,
+                    "payload": result.payload,
+                    "id": result.id
+                })
+        return results
+    
+    def _filtered_count(self, query_filter: Optional[Filter], country: str, year: str) -> Optional[int]:
+        """
+        Approximate number of points matching the metadata filter, cached per (country, year).
+        
+        Returns None (so the search uses HNSW) when there is no filter or the count fails.
+        """
+        if query_filter is None:
+            return None
+        filtered_count = self._filtered_counts.get((country, year))
+        if filtered_count is None:
+            try:
+                filtered_count = self.client.count(
+                    collection_name=self.collection_name,
+                    count_filter=query_filter,
+                    exact=False
+                ).count
+                self._filtered_counts[(country, year)] = filtered_count
+            except Exception as e:
+                # Only the exact-search shortcut depends on the count; the search itself can go ahead
+                logger.warning(f"Qdrant filtered count failed: {str(e)}. Using HNSW search.")
+        return filtered_count
+    
+    @staticmethod
+    def _search_params(hnsw_ef: Optional[int], filtered_count: Optional[int]) -> SearchParams:
+        """
+        Per-query search parameters.
+        
+        Filtered sets smaller than QDRANT_EXACT_SEARCH_THRESHOLD points are
+        scanned exactly (cheaper than walking the HNSW graph over a sparse
+        filter); everything else uses HNSW with the given beam width.
+        """
+        exact = filtered_count is not None and filtered_count < settings.qdrant_exact_search_threshold
+        return SearchParams(
+            hnsw_ef=hnsw_ef or settings.qdrant_hnsw_ef,
+            exact=exact,
+            quantization=_QUANTIZATION_PARAMS
+        )
+    
+    @staticmethod
+    def _metadata_filter(country: str, year: str) -> Optional[Filter]:
+        """Payload filter on metadata.country/year (None when filtering is disabled)."""
+        if not settings.qdrant_metadata_filters:
+            return None
+        return Filter(must=[
+            FieldCondition(key="metadata.country", match=MatchValue(value=country)),
+            FieldCondition(key="metadata.year", match=MatchValue(value=year))
+        ])
+    
+    def _search_cache(self, limit: int, country: str, year: str) -> Optional[SemanticCache]:
+        """Return the search result cache for this limit and filter (None if disabled)."""
+        if not self.search_cache_enabled:
+            return None
+        key = (limit, country, year)
+        cache = self._search_caches.get(key)
+        if cache is None:
+            cache = SemanticCache(
+                threshold=settings.search_cache_similarity_threshold,
+                ttl_seconds=settings.search_cache_ttl_seconds,
+                max_entries=settings.search_cache_max_entries
+            )
+            self._search_caches[key] = cache
+        return cache
+    
     def format_context(self, search_results: List[Dict[str, Any]]) -> str:
         """
         Format search results into a context string for LLM.
@@ -153,19 +660,101 @@ class QdrantService:
         if not search_results:
             return "No relevant context found in knowledge base."
         
-        context_parts = []
-        for i, result in enumerate(search_results, 1):
-            payload = result.get("payload", {})
-            # LangChain QdrantVectorStore stores: page_content and metadata
-            content = payload.get("page_content", "")
-            metadata = payload.get("metadata", {})
-            source_filename = metadata.get("source_filename") or metadata.get("source", "Unknown")
-            
-            context_parts.append(f"Context {i} (Source: {source_filename}):\n{content}")
+        return "\n---\n".join(
+            _CONTEXT_TEMPLATE.format(i, *self._context_fields(result))
+            for i, result in enumerate(search_results, 1)
+        )
+    
+    @staticmethod
+    def _context_fields(result: Dict[str, Any]) -> Tuple[str, str]:
+        """Return (source filename, content) for one search result."""
+        payload = result.get("payload") or {}
+        # LangChain QdrantVectorStore stores: page_content and metadata
+        metadata = payload.get("metadata") or {}
+        source_filename = metadata.get("source_filename") or metadata.get("source", "Unknown")
+        return source_filename, payload.get("page_content", "")
+    
+    def embed_batch(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Convert several texts to embedding vectors with as few OpenAI calls as possible.
+        
+        Cached texts are served from the query embedding cache; the rest are sent
+        in chunks of up to 2048 inputs (the embeddings API limit) per request.
+        
+        Args:
+            texts: Texts to convert to embeddings
+        
+        Returns:
+            One embedding vector per input text, in input order (None where the
+            embedding call failed)
+        """
+        embeddings, missing = self._cached_embeddings(texts)
+        if missing:
+            try:
+                for chunk in self._embedding_chunks(missing):
+                    response = self.openai_client.embeddings.create(
+                        model=_EMBEDDING_MODEL,
+                        input=chunk
+                    )
+                    self._store_embeddings(chunk, response, missing, embeddings)
+            except Exception:
+                logger.exception("Query embedding failed")
+        
+        return embeddings
+    
+    async def aembed_batch(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Async variant of embed_batch() using the async OpenAI client."""
+        embeddings, missing = self._cached_embeddings(texts)
+        if missing:
+            try:
+                for chunk in self._embedding_chunks(missing):
+                    response = await self.async_openai_client.embeddings.create(
+                        model=_EMBEDDING_MODEL,
+                        input=chunk
+                    )
+                    self._store_embeddings(chunk, response, missing, embeddings)
+            except Exception:
+                logger.exception("Query embedding failed")
+        
+        return embeddings
+    
+    @staticmethod
+    def _cached_embeddings(texts: List[str]) -> Tuple[List[Optional[np.ndarray]], Dict[str, List[int]]]:
+        """Look texts up in the embedding cache; returns (embeddings, text -> positions still missing)."""
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = _embedding_cache.get(text)
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
         
-        return "\n---\n".join(context_parts)
+        if len(missing) < len(texts):
+            logger.debug(f"Query embedding cache hits: {len(texts) - sum(map(len, missing.values()))}/{len(texts)}")
+        return embeddings, missing
+    
+    @staticmethod
+    def _embedding_chunks(missing: Dict[str, List[int]]) -> List[List[str]]:
+        """Split uncached texts into request-sized chunks."""
+        # Inputs of similar length in one request reduce server-side padding
+        pending = sorted(missing, key=len)
+        return [pending[start:start + _EMBEDDING_BATCH_SIZE] for start in range(0, len(pending), _EMBEDDING_BATCH_SIZE)]
     
-    def _text_to_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _store_embeddings(chunk: List[str], response, missing: Dict[str, List[int]], embeddings: List) -> None:
+        """Cache one embeddings response and place its vectors at their input positions."""
+        for item in response.data:
+            text = chunk[item.index]
+            # float32 array: ~6 KB per vector instead of 1536 Python floats (~43 KB);
+            # qdrant-client takes numpy arrays as query vectors directly
+            vector = np.asarray(item.embedding, dtype=np.float32)
+            vector.setflags(write=False)
+            _embedding_cache.put(text, vector)
+            for i in missing[text]:
+                embeddings[i] = vector
+    
+    def _text_to_embedding(self, text: str) -> Optional[np.ndarray]:
         """
         Convert text to embedding vector using OpenAI.
         
@@ -173,16 +762,6 @@ class QdrantService:
             text: Text to convert to embedding
         
         Returns:
-            List of floats representing the embedding vector
+            float32 embedding vector, or None if the call failed
         """
-        try:
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"Error generating embedding: {str(e)}")
-            # Return empty vector as fallback (will result in no matches)
-            return [0.0] * 1536  # text-embedding-3-small dimension
-
+        return self.embed_batch([text])[0]
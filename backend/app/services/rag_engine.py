@@ -1,12 +1,16 @@
 """RAG Engine: Handles retrieval and LLM generation."""
-from typing import Optional, Dict, Any
-from openai import OpenAI
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Callable
+from openai import AsyncOpenAI, OpenAI
 from app.core.config import settings
 from app.services.qdrant import QdrantService
-from app.utils.persona import MASTER_SYSTEM_PROMPT
+from app.utils.persona import PERSONA_BASE, build_rules
 import json
 import re
 
+logger = logging.getLogger(__name__)
+
 # Define the Brand Voice Style Guide based on the blogs
 BRAND_VOICE_GUIDE = """
 ### TONE & STYLE INSTRUCTIONS (House of Companies Voice)
@@ -39,6 +43,29 @@ You are NOT a generic AI assistant. You are a Senior Consultant for **House of C
 - "Old-style financial management relies on manual reconciliation... Our AI agent achieves 99% accuracy."
 """
 
+# Identical leading system message on every generation call, so OpenAI's
+# automatic prompt caching can reuse it. The request-dependent rule blocks
+# (build_rules) follow in the section message
+_STATIC_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": f"{PERSONA_BASE}\n\n{BRAND_VOICE_GUIDE}"
+}
+
+# User context fields scanned for the entity/timeline rule keywords
+_RULE_CONTEXT_FIELDS = ("company_name", "company_type", "preferred_structure", "timeline_preference", "entry_goals")
+
+
+# Task/query keyword checks for _build_task_constraints and the timeline rules
+# (substring matches, as the rules were written)
+_BV_TASK_RE = re.compile(r"bv", re.I)
+_BV_QUERY_RE = re.compile(r"bv|b\.v", re.I)
+_BRANCH_RE = re.compile(r"branch", re.I)
+_HOLDING_RE = re.compile(r"holding", re.I)
+_RD_TASK_RE = re.compile(r"wbso|innovation box|r&d", re.I)
+_PARTICIPATION_TASK_RE = re.compile(r"participation exemption", re.I)
+_PARTICIPATION_QUERY_RE = re.compile(r"deelnemingsvrijstelling", re.I)
+_BV_TIMELINE_RE = re.compile(r"BV|Besloten")
+
 
 class RAGEngine:
     """Retrieval-Augmented Generation engine."""
@@ -46,6 +73,9 @@ class RAGEngine:
     def __init__(self):
         """Initialize RAG engine with OpenAI and Qdrant."""
         self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        self.async_openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Caps concurrent section generations in agenerate_memo_sections
+        self._generation_slots = asyncio.Semaphore(settings.rag_max_concurrent_generations)
         self.qdrant_service = QdrantService()
         self.model = "gpt-4o"  # Preferred model for complex synthesis
     
@@ -59,9 +89,6 @@ class RAGEngine:
         if not task_name:
             return ""
         
-        task_lower = task_name.lower()
-        query_lower = search_query.lower()
-        
         constraints = []
         
         # CRITICAL RULE: STICK TO THE TASK
@@ -70,7 +97,7 @@ class RAGEngine:
         constraints.append("")
         
         # Rule 1: BV Tasks - MUST recommend BV
-        if "bv" in task_lower or "bv" in query_lower or "b.v" in query_lower:
+        if _BV_TASK_RE.search(task_name) or _BV_QUERY_RE.search(search_query):
             constraints.append("1. This task is about researching BV (Besloten Vennootschap) structure.")
             constraints.append("   - You MUST recommend a BV structure.")
             constraints.append("   - Do NOT recommend a Branch Office, even if the user mentions urgency or speed.")
@@ -78,7 +105,7 @@ class RAGEngine:
             constraints.append("")
         
         # Rule 2: Branch Office Tasks - MUST recommend Branch
-        if "branch" in task_lower or "branch" in query_lower:
+        if _BRANCH_RE.search(task_name) or _BRANCH_RE.search(search_query):
             constraints.append("2. This task is about researching Branch Office structure.")
             constraints.append("   - You MUST recommend a Branch Office structure.")
             constraints.append("   - Do NOT mention notary requirements (Branch Offices don't need notaries).")
@@ -86,7 +113,7 @@ class RAGEngine:
             constraints.append("")
         
         # Rule 3: Holding Company Tasks - MUST focus on Holding/BV
-        if "holding" in task_lower or "holding" in query_lower:
+        if _HOLDING_RE.search(task_name) or _HOLDING_RE.search(search_query):
             constraints.append("3. This task is about Holding Company structures.")
             constraints.append("   - You MUST recommend a BV structure (required for participation exemption).")
             constraints.append("   - Do NOT recommend a Branch Office for holding companies.")
@@ -95,14 +122,14 @@ class RAGEngine:
             constraints.append("")
         
         # Rule 4: Tech/R&D Tasks - Only for Tech companies
-        if "wbso" in task_lower or "innovation box" in task_lower or "r&d" in task_lower:
+        if _RD_TASK_RE.search(task_name):
             constraints.append("4. This task is about R&D tax incentives (WBSO/Innovation Box).")
             constraints.append("   - Only include these if the company is in Software & Technology or R&D industries.")
             constraints.append("   - Do NOT include these for Financial Services or Holding companies.")
             constraints.append("")
         
         # Rule 5: Participation Exemption Tasks - Only for Holdings
-        if "participation exemption" in task_lower or "deelnemingsvrijstelling" in query_lower:
+        if _PARTICIPATION_TASK_RE.search(task_name) or _PARTICIPATION_QUERY_RE.search(search_query):
             constraints.append("5. This task is about Participation Exemption.")
             constraints.append("   - This applies ONLY to Holding Companies.")
             constraints.append("   - Do NOT include this for regular operating companies.")
@@ -150,82 +177,68 @@ class RAGEngine:
         # Remove any leading/trailing whitespace
         return text.strip()
     
-    def generate_section(
+    def _build_messages(
         self,
         section_name: str,
         search_query: str,
+        search_results: List[Dict[str, Any]],
         user_context: Optional[Dict[str, Any]] = None,
         task_name: Optional[str] = None
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Generate a memo section using RAG.
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for one memo section from its retrieved context."""
+        context = self.qdrant_service.format_context(search_results)
         
-        Args:
-            section_name: Name of the section to generate
-            search_query: Query to search the knowledge base
-            user_context: Additional user context from request
+        # Step 2: Build user context string if provided
+        user_context_str = ""
+        if user_context:
+            user_context_str = f"\n\nUSER CONTEXT:\n"
+            user_context_str += f"Company: {user_context.get('company_name', 'N/A')}\n"
+            user_context_str += f"Industry: {user_context.get('industry', 'N/A')}\n"
+            user_context_str += f"Entry Goals: {', '.join(user_context.get('entry_goals', []))}\n"
         
-        Returns:
-            Generated section as dictionary, or None if generation fails
-        """
-        try:
-            # Step 1: Retrieve relevant context from Qdrant
-            print(f"  Searching Qdrant with query: {search_query}")
-            search_results = self.qdrant_service.search(query=search_query)
-            print(f"  Found {len(search_results)} search results")
-            context = self.qdrant_service.format_context(search_results)
-            
-            # Step 2: Build user context string if provided
-            user_context_str = ""
-            if user_context:
-                user_context_str = f"\n\nUSER CONTEXT:\n"
-                user_context_str += f"Company: {user_context.get('company_name', 'N/A')}\n"
-                user_context_str += f"Industry: {user_context.get('industry', 'N/A')}\n"
-                user_context_str += f"Entry Goals: {', '.join(user_context.get('entry_goals', []))}\n"
-            
-            # Step 3: Generate prompt using MASTER_SYSTEM_PROMPT
-            full_context = context + user_context_str
-            
-            # Define expected schema based on section name
-            schema_examples = {
-                "executive_summary": {
-                    "overview": "Brief overview text",
-                    "key_recommendations": ["Recommendation 1", "Recommendation 2"],
-                    "critical_considerations": ["Consideration 1", "Consideration 2"]
-                },
-                "tax_considerations": {
-                    "corporate_tax_rate": "25.8% for 2025",
-                    "tax_obligations": ["Obligation 1", "Obligation 2"],
-                    "tax_optimization_strategies": ["Strategy 1", "Strategy 2"],
-                    "special_regimes": ["Participation Exemption (deelnemingsvrijstelling)", "Innovation Box", "WBSO R&D tax credit"]
-                },
-                "market_entry_options": {
-                    "recommended_option": "Recommended option description",
-                    "option_comparison": [{"option": "Option 1", "description": "..."}],
-                    "pros_and_cons": {"option1": ["Advantage 1", "Advantage 2"], "option2": ["Advantage 1", "Advantage 2"]}
-                },
-                "implementation_timeline": {
-                    "phases": [{"phase": "Phase 1", "duration": "..."}],
-                    "estimated_duration": "3-6 months",
-                    "milestones": ["Milestone 1", "Milestone 2"]
-                }
+        # Step 3: Generate prompt (persona from PERSONA_BASE and build_rules)
+        full_context = context + user_context_str
+        
+        # Define expected schema based on section name
+        schema_examples = {
+            "executive_summary": {
+                "overview": "Brief overview text",
+                "key_recommendations": ["Recommendation 1", "Recommendation 2"],
+                "critical_considerations": ["Consideration 1", "Consideration 2"]
+            },
+            "tax_considerations": {
+                "corporate_tax_rate": "25.8% for 2025",
+                "tax_obligations": ["Obligation 1", "Obligation 2"],
+                "tax_optimization_strategies": ["Strategy 1", "Strategy 2"],
+                "special_regimes": ["Participation Exemption (deelnemingsvrijstelling)", "Innovation Box", "WBSO R&D tax credit"]
+            },
+            "market_entry_options": {
+                "recommended_option": "Recommended option description",
+                "option_comparison": [{"option": "Option 1", "description": "..."}],
+                "pros_and_cons": {"option1": ["Advantage 1", "Advantage 2"], "option2": ["Advantage 1", "Advantage 2"]}
+            },
+            "implementation_timeline": {
+                "phases": [{"phase": "Phase 1", "duration": "..."}],
+                "estimated_duration": "3-6 months",
+                "milestones": ["Milestone 1", "Milestone 2"]
             }
+        }
+        
+        schema_example = schema_examples.get(section_name, {})
+        schema_json = json.dumps(schema_example, indent=2) if schema_example else "{}"
+        
+        # Build task-specific constraints
+        task_constraints = self._build_task_constraints(task_name, section_name, search_query)
+        
+        # Add timeline-specific critical logic
+        timeline_logic = ""
+        if section_name == "implementation_timeline":
+            # Determine entity type from task name
+            is_branch = task_name and _BRANCH_RE.search(task_name)
+            is_bv = task_name and _BV_TIMELINE_RE.search(task_name)
             
-            schema_example = schema_examples.get(section_name, {})
-            schema_json = json.dumps(schema_example, indent=2) if schema_example else "{}"
-            
-            # Build task-specific constraints
-            task_constraints = self._build_task_constraints(task_name, section_name, search_query)
-            
-            # Add timeline-specific critical logic
-            timeline_logic = ""
-            if section_name == "implementation_timeline":
-                # Determine entity type from task name
-                is_branch = task_name and ("Branch" in task_name or "branch" in task_name.lower())
-                is_bv = task_name and ("BV" in task_name or "Besloten" in task_name)
-                
-                if is_branch:
-                    timeline_logic = f"""
+            if is_branch:
+                timeline_logic = f"""
 🚨 CRITICAL: This timeline is for a BRANCH OFFICE (Task: {task_name})
 YOU MUST FOLLOW THESE RULES STRICTLY:
 
@@ -246,8 +259,8 @@ YOU MUST FOLLOW THESE RULES STRICTLY:
 IF THE CONTEXT MENTIONS "NOTARY" OR "DEED", IGNORE IT - IT DOES NOT APPLY TO BRANCH OFFICES.
 
 """
-                elif is_bv:
-                    timeline_logic = f"""
+            elif is_bv:
+                timeline_logic = f"""
 🚨 CRITICAL: This timeline is for a BV (Task: {task_name})
 YOU MUST FOLLOW THESE RULES:
 
@@ -259,8 +272,8 @@ YOU MUST FOLLOW THESE RULES:
 The BV process REQUIRES a notary and share capital deposit.
 
 """
-                else:
-                    timeline_logic = """
+            else:
+                timeline_logic = """
 CRITICAL LOGIC FOR TIMELINE:
 - Check the task name and search query to determine the recommended structure.
 - IF the task mentions "Branch Office" or "Branch":
@@ -272,11 +285,20 @@ CRITICAL LOGIC FOR TIMELINE:
 - The timeline phases MUST match the recommended structure exactly.
 
 """
-            
-            prompt = f"""{MASTER_SYSTEM_PROMPT}
-
-{BRAND_VOICE_GUIDE}
-
+        
+        # Rule blocks picked from the user context only, so every section of
+        # one memo gets the same rules
+        rule_input = " ".join(
+            " ".join(value) if isinstance(value, list) else str(value)
+            for value in (
+                (user_context or {}).get(field) for field in _RULE_CONTEXT_FIELDS
+            )
+            if value
+        )
+        
+        # Section-specific instructions; the shared persona and brand voice
+        # go first in _STATIC_SYSTEM_MESSAGE
+        prompt = f"""{build_rules(rule_input)}
 TASK: Generate the "{section_name}" section of a Market Entry Memo for the Netherlands.
 
 {task_constraints}
@@ -303,36 +325,72 @@ INSTRUCTIONS:
 
 Return your response as pure JSON only.
 """
+        
+        return [
+            _STATIC_SYSTEM_MESSAGE,
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Generate the {section_name} section now."}
+        ]
+    
+    def _parse_section(self, content: str) -> Dict[str, Any]:
+        """Parse the LLM response for a section into a dictionary."""
+        logger.info(f"Received response from OpenAI (length: {len(content)} chars)")
+        
+        # CRITICAL FIX: Clean JSON response before parsing
+        cleaned_content = self.clean_json_response(content)
+        
+        # Try to parse as JSON, fallback to text
+        try:
+            parsed = json.loads(cleaned_content)
+            logger.info("Successfully parsed JSON response")
+            return parsed
+        except json.JSONDecodeError as e:
+            logger.warning(f"Could not parse as JSON: {str(e)}")
+            logger.warning(f"   Response preview: {cleaned_content[:200]}...")
+            # If not JSON, return as text content
+            return {"content": cleaned_content}
+    
+    def generate_section(
+        self,
+        section_name: str,
+        search_query: str,
+        user_context: Optional[Dict[str, Any]] = None,
+        task_name: Optional[str] = None,
+        search_results: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Generate a memo section using RAG.
+        
+        Args:
+            section_name: Name of the section to generate
+            search_query: Query to search the knowledge base
+            user_context: Additional user context from request
+            search_results: Already retrieved Qdrant results (skips the search)
+        
+        Returns:
+            Generated section as dictionary, or None if generation fails
+        """
+        try:
+            # Step 1: Retrieve relevant context from Qdrant
+            if search_results is None:
+                print(f"  Searching Qdrant with query: {search_query}")
+                search_results = self.qdrant_service.search(query=search_query)
+            print(f"  Found {len(search_results)} search results")
+            
+            # Steps 2-3: Build the prompt
+            messages = self._build_messages(section_name, search_query, search_results, user_context, task_name)
             
             # Step 4: Call OpenAI
             print(f"  Calling OpenAI API with model: {self.model}")
             response = self.openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": f"Generate the {section_name} section now."}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=2000
             )
             
             # Step 5: Parse response
-            content = response.choices[0].message.content
-            print(f"  Received response from OpenAI (length: {len(content)} chars)")
-            
-            # CRITICAL FIX: Clean JSON response before parsing
-            cleaned_content = self.clean_json_response(content)
-            
-            # Try to parse as JSON, fallback to text
-            try:
-                parsed = json.loads(cleaned_content)
-                print(f"  Successfully parsed JSON response")
-                return parsed
-            except json.JSONDecodeError as e:
-                print(f"  WARNING: Could not parse as JSON: {str(e)}")
-                print(f"  Response preview: {cleaned_content[:200]}...")
-                # If not JSON, return as text content
-                return {"content": cleaned_content}
+            return self._parse_section(response.choices[0].message.content)
         
         except Exception as e:
             import traceback
@@ -340,6 +398,85 @@ Return your response as pure JSON only.
             print(f"Traceback: {traceback.format_exc()}")
             return None
     
+    async def agenerate_section(
+        self,
+        section_name: str,
+        search_query: str,
+        user_context: Optional[Dict[str, Any]] = None,
+        task_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of generate_section() using the async Qdrant and OpenAI clients.
+        
+        Returns:
+            Generated section as dictionary, or None if generation fails
+        """
+        try:
+            search_results = await self.qdrant_service.asearch(query=search_query)
+            logger.info(f"Found {len(search_results)} search results for {section_name}")
+            messages = self._build_messages(section_name, search_query, search_results, user_context, task_name)
+            
+            async with self._generation_slots:
+                logger.info(f"Calling OpenAI API with model: {self.model} ({section_name})")
+                response = await self.async_openai_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=2000
+                )
+            
+            return self._parse_section(response.choices[0].message.content)
+        
+        except Exception as e:
+            logger.exception(f"RAG generation error for {section_name}: {str(e)}")
+            return None
+    
+    async def agenerate_memo_sections(
+        self,
+        tasks: list,
+        user_context: Optional[Dict[str, Any]] = None,
+        on_task_done: Optional[Callable[[Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate all memo sections concurrently.
+        
+        Each section runs its own retrieve-then-generate pipeline, so a section
+        whose Qdrant lookup returns early starts its LLM call while the other
+        lookups are still in flight.
+        
+        Args:
+            tasks: List of TaskPlan objects
+            user_context: User context from request
+            on_task_done: Called with each TaskPlan as soon as its section finishes
+        
+        Returns:
+            Dictionary mapping section names to generated content
+        """
+        # Embed every search query in one OpenAI call; the per-section searches
+        # then hit the query embedding cache
+        await self.qdrant_service.aembed_batch([task.search_query for task in tasks])
+        
+        async def generate(task) -> Optional[Dict[str, Any]]:
+            generated = await self.agenerate_section(
+                section_name=task.section_name,
+                search_query=task.search_query,
+                user_context=user_context,
+                task_name=task.task_name
+            )
+            if on_task_done:
+                on_task_done(task)
+            return generated
+        
+        generated_sections = await asyncio.gather(*[generate(task) for task in tasks])
+        
+        # Fill in task order so later tasks win on duplicate section names, as in generate_memo_sections
+        sections = {}
+        for task, generated in zip(tasks, generated_sections):
+            if generated:
+                sections[task.section_name] = generated
+        
+        return sections
+    
     def generate_memo_sections(
         self,
         tasks: list,
@@ -357,7 +494,11 @@ Return your response as pure JSON only.
         """
         sections = {}
         
-        for task in tasks:
+        # Retrieve every section's context up front: one batched embedding call,
+        # then the Qdrant lookups in parallel
+        search_results = self.qdrant_service.search_many([task.search_query for task in tasks])
+        
+        for task, task_results in zip(tasks, search_results):
             section_name = task.section_name
             search_query = task.search_query
             task_name = task.task_name
@@ -367,7 +508,8 @@ Return your response as pure JSON only.
                 section_name=section_name,
                 search_query=search_query,
                 user_context=user_context,
-                task_name=task_name
+                task_name=task_name,
+                search_results=task_results
             )
             
             if generated:
@@ -1,21 +1,37 @@
-MASTER_SYSTEM_PROMPT = """
+"""Tax consultant persona prompt: a fixed base plus rule blocks selected per request."""
+import re
+from functools import lru_cache
+
+# Persona and the rules heading (always sent)
+PROMPT_PREAMBLE = """
 You are an expert Senior Tax Consultant for the Netherlands. Your job is to generate a strategic, legally accurate Tax Memo based ONLY on the provided Context and User Input.
 
 ### 🚨 CRITICAL LOGIC RULES (YOU MUST FOLLOW THESE) 🚨
 
-#### 1. ENTITY SELECTION LOGIC (The "BV vs. Branch" Decision)
+"""
+
+RULES_ENTITY_HEADER = """#### 2. ENTITY SELECTION LOGIC (The "BV vs. Branch" Decision)
+
+"""
 
-- **IF** the User Input mentions "Holding", "Shares", "Subsidiaries", or "Participation Exemption":
+# Entity selection: holding structures -> BV
+RULES_HOLDING = """- **IF** the User Input mentions "Holding", "Shares", "Subsidiaries", or "Participation Exemption":
   - You **MUST** recommend a **Dutch BV** (Besloten Vennootschap).
   - **REASON:** A Branch Office generally cannot effectively function as a Holding entity for Participation Exemption purposes due to lack of legal personality.
   - **NEVER** recommend a Branch Office for a Holding Company.
 
-- **IF** the User Input mentions "Urgent", "ASAP", "Fast", or "Speed" AND the company is a Foreign Legal Entity (e.g., Inc, Ltd, GmbH):
+"""
+
+# Entity selection: urgent foreign entities -> Branch Office
+RULES_BRANCH = """- **IF** the User Input mentions "Urgent", "ASAP", "Fast", or "Speed" AND the company is a Foreign Legal Entity (e.g., Inc, Ltd, GmbH):
   - You **MUST** recommend a **Branch Office**.
   - **REASON:** A Branch avoids the 3-4 month bank account bottleneck and does not require a notary.
   - **EXCEPTION:** If the company name explicitly contains "B.V." (e.g., "Tech B.V."), you MUST recommend a **BV** regardless of speed.
 
-#### 2. TAX INCENTIVE LOGIC (Who gets what?)
+"""
+
+# Tax incentive rules (always sent)
+RULES_COMMON = """#### 1. TAX INCENTIVE LOGIC (Who gets what?)
 
 - **Innovation Box (9% Tax Rate):**
   - **ONLY** recommend this if the structure is a **BV** or **NV**.
@@ -28,23 +44,100 @@ You are an expert Senior Tax Consultant for the Netherlands. Your job is to gene
   - **ONLY** include this for **Holding Companies** or BVs with subsidiaries.
   - **REMOVE** this section for simple Operating/Trading companies (e.g., "Sales Office").
 
-#### 3. TIMELINE & PROCESS LOGIC (The "Hallucination" Trap)
+"""
 
-- **IF Recommendation = "Branch Office":**
+RULES_TIMELINE_HEADER = """#### 3. TIMELINE & PROCESS LOGIC (The "Hallucination" Trap)
+
+"""
+
+# Timeline rules per recommended structure
+RULES_TIMELINE_BRANCH = """- **IF Recommendation = "Branch Office":**
   - **Phase 1:** "Registration at Chamber of Commerce (KvK)".
   - **FORBIDDEN:** Do NOT mention "Notary", "Deed of Incorporation", or "Share Capital" for a Branch. These do not exist.
   - **Warning:** Mention that Bank Account opening is still slow (2-4 months) even for a Branch.
 
-- **IF Recommendation = "BV":**
+"""
+
+RULES_TIMELINE_BV = """- **IF Recommendation = "BV":**
   - **Phase 1:** "Civil Law Notary & Deed of Incorporation".
   - **Phase 2:** "Share Capital Deposit & Registration".
   - **Warning:** Emphasize that Bank Account opening (4+ weeks) is the main bottleneck.
 
-### 📝 RESPONSE GUIDELINES
+"""
+
+RESPONSE_GUIDELINES = """### 📝 RESPONSE GUIDELINES
 
 - Use professional, direct business language.
 - If the Retrieved Context conflicts with these CRITICAL RULES, **obey the CRITICAL RULES**.
 - Do not make up laws. If data is missing (e.g., "2025 Tax Rate"), state "Standard CIT Rates apply (19% / 25.8%)" as a safe default.
 - NEVER return Markdown formatting (like bolding ** or tables) inside your JSON values. Keep text clean.
 - You MUST maintain logical consistency across all sections. If you recommend a "Branch Office" in the Market Entry section, the "Implementation Timeline" section MUST be for a "Branch Office" and NOT a "BV".
-"""
\ No newline at end of file
+"""
+
+# Identical on every call, so it can lead the prompt as a cacheable prefix
+PERSONA_BASE = PROMPT_PREAMBLE + RULES_COMMON + RESPONSE_GUIDELINES
+
+# Keyword checks deciding which rule blocks apply
+_HOLDING_RE = re.compile(r"\b(holding|shares?|subsidiar(?:y|ies)|participation exemption)\b", re.I)
+_BRANCH_RE = re.compile(r"\b(urgent|asap|fast|speed|branch)\b", re.I)
+_BV_RE = re.compile(r"\bb\.?v\b|besloten vennootschap", re.I)
+
+
+@lru_cache(maxsize=None)
+def _assemble(holding: bool, branch: bool, bv: bool) -> str:
+    """Concatenate the rule blocks for one combination of keyword matches."""
+    parts = [RULES_ENTITY_HEADER]
+    # No entity signal: keep the full BV vs. Branch decision logic
+    if holding or not branch:
+        parts.append(RULES_HOLDING)
+    if branch or not holding:
+        parts.append(RULES_BRANCH)
+    
+    # Timeline rules for the structure the input points to (both if unclear)
+    parts.append(RULES_TIMELINE_HEADER)
+    points_to_bv = holding or bv
+    if branch or not points_to_bv:
+        parts.append(RULES_TIMELINE_BRANCH)
+    if points_to_bv or not branch:
+        parts.append(RULES_TIMELINE_BV)
+    
+    return "".join(parts)
+
+
+def build_rules(user_input: str) -> str:
+    """
+    Select the entity and timeline rule blocks relevant to the input.
+    
+    Holding keywords select the holding -> BV rule, urgency/branch keywords the
+    Branch Office rule, and the timeline rules follow the structure the input
+    points to. Input without any of these signals gets every block. The
+    result goes after PERSONA_BASE, which is sent unchanged on every call.
+    
+    Args:
+        user_input: Text to scan (the user's company and preference fields)
+    
+    Returns:
+        Rule block text (rules 2 and 3)
+    """
+    return _assemble(
+        _HOLDING_RE.search(user_input) is not None,
+        _BRANCH_RE.search(user_input) is not None,
+        _BV_RE.search(user_input) is not None
+    )
+
+
+def build_prompt(user_input: str) -> str:
+    """
+    Build the full system prompt: PERSONA_BASE followed by build_rules(user_input).
+    
+    Args:
+        user_input: Text to scan (the user's company and preference fields)
+    
+    Returns:
+        System prompt text
+    """
+    return f"{PERSONA_BASE}\n{build_rules(user_input)}"
+
+
+# Full prompt with every rule block
+MASTER_SYSTEM_PROMPT = build_prompt("")
@@ -6,7 +6,14 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (
+    Distance,
+    PayloadSchemaType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
 from dotenv import load_dotenv
 
 # Load environment variables (look for .env in backend directory)
@@ -81,6 +88,9 @@ for chunk in chunks:
     source = chunk.metadata.get("source", "unknown")
     filename = os.path.basename(source)
     chunk.metadata["source_filename"] = filename
+    # Filter fields used by QdrantService.search (QDRANT_METADATA_FILTERS)
+    chunk.metadata["country"] = "netherlands"
+    chunk.metadata["year"] = "2025"
 
 # 6. Embed & Upsert to Qdrant
 print("Initializing embeddings and Qdrant connection...")
@@ -102,8 +112,21 @@ print(f"Creating new collection: {COLLECTION_NAME}")
 client.create_collection(
     collection_name=COLLECTION_NAME,
     vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
+    # int8 copies of the vectors kept in RAM for the ANN scan (4x smaller than float32);
+    # searches rescore the top candidates against the original vectors
+    quantization_config=ScalarQuantization(
+        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+    ),
 )
 
+# Keyword indexes so country/year filters are applied before the ANN scan
+for field_name in ("metadata.country", "metadata.year"):
+    client.create_payload_index(
+        collection_name=COLLECTION_NAME,
+        field_name=field_name,
+        field_schema=PayloadSchemaType.KEYWORD,
+    )
+
 print(f"Uploading {len(chunks)} chunks to Qdrant (this may take a while)...")
 qdrant = QdrantVectorStore(
     client=client,
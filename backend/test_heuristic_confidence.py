@@ -0,0 +1,47 @@
+"""Offline checks for the Semantic Router's heuristic confidence scoring."""
+import os
+
+# Settings require these; no OpenAI or Qdrant call is made
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("QDRANT_URL", "http://localhost:6333")
+
+from app.core.semantic_router import SemanticRouter
+from app.models.request import TaxMemoRequest
+
+
+def _confidence(timeline: str) -> float:
+    """Heuristic confidence for a foreign software company with the given timeline."""
+    router = SemanticRouter()
+    request = TaxMemoRequest(
+        company_name="Acme Inc",
+        company_type="Corporation",
+        industry="Software",
+        timeline_preference=timeline
+    )
+    intent = router._fallback_classification(request)
+    return router._heuristic_confidence(request, intent)
+
+
+def test_conflicting_timeline_goes_to_llm():
+    """Urgent and low-urgency keywords together must not skip the LLM."""
+    assert _confidence("No rush, flexible - not fast") == 0.0
+
+
+def test_negated_timeline_goes_to_llm():
+    """A negated urgency keyword must not skip the LLM."""
+    assert _confidence("not urgent, 12 months") == 0.0
+    assert _confidence("not urgent") == 0.0
+
+
+def test_clear_timeline_keeps_its_weight():
+    """Unambiguous timelines still count towards skipping the LLM."""
+    threshold = 0.8
+    assert _confidence("ASAP (within 1 month)") >= threshold
+    assert _confidence("Flexible (12 months)") >= threshold
+
+
+if __name__ == "__main__":
+    test_conflicting_timeline_goes_to_llm()
+    test_negated_timeline_goes_to_llm()
+    test_clear_timeline_keeps_its_weight()
+    print("✅ Heuristic confidence checks passed")
@@ -1,4 +1,5 @@
 """Direct test of RAG engine to diagnose empty response issue."""
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -85,7 +86,7 @@ def test_rag_engine():
             tax_considerations=["Corporate income tax implications"]
         )
         
-        tasks = orchestrator.plan_tasks(request)
+        tasks = asyncio.run(orchestrator.plan_tasks(request))
         print(f"   ✓ Planned {len(tasks)} tasks")
         
         user_context = {
@@ -3,10 +3,10 @@ Streamlit UI for Tax Memo Generator - V2
 AI-Powered Semantic Router - Professional Multi-Step Interface
 """
 import streamlit as st
-import requests
 import json
-from typing import Dict, Any, List
-from datetime import datetime
+import re
+from typing import Dict, Any, List, Optional
+# requests and datetime are imported where used: the first page render needs neither
 
 # Page configuration
 st.set_page_config(
@@ -16,15 +16,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# V2 Banner
-st.sidebar.markdown("---")
-st.sidebar.markdown("### 🚀 Version 2.0")
-st.sidebar.markdown("*AI-Powered Semantic Router*")
-st.sidebar.markdown("**✨ New Features:**")
-st.sidebar.markdown("- Understands synonyms")
-st.sidebar.markdown("- Natural language")
-st.sidebar.markdown("- Context-aware")
-st.sidebar.markdown("---")
+# V2 Banner (one markdown element)
+st.sidebar.markdown("""
+---
+
+### 🚀 Version 2.0
+
+*AI-Powered Semantic Router*
+
+**✨ New Features:**
+- Understands synonyms
+- Natural language
+- Context-aware
+
+---
+""")
 
 # API Configuration
 API_URL = st.sidebar.text_input(
@@ -33,6 +39,30 @@ API_URL = st.sidebar.text_input(
     help="Enter your backend API URL (default: production server)"
 )
 
+@st.cache_resource
+def get_http_session() -> "requests.Session":
+    """Shared HTTP session, so memo requests reuse the backend's TLS connection"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    # Retry connection failures and 502/503 from a backend that is still starting up.
+    # Read errors are never retried: the backend has already accepted the POST
+    retries = Retry(
+        connect=2,
+        read=0,
+        status=2,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503],
+        allowed_methods=["POST"],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 # Initialize session state
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 1
@@ -70,6 +100,14 @@ COMPANY_SIZES = [
     "Large (251+ employees)"
 ]
 
+# Company size -> employeeCount sent to the backend
+SIZE_MAP = {
+    "Startup (1-10 employees)": 5,
+    "Small (11-50 employees)": 25,
+    "Medium (51-250 employees)": 100,
+    "Large (251+ employees)": 500
+}
+
 # Entry goals options
 ENTRY_GOALS = [
     "Sell products/services",
@@ -107,83 +145,171 @@ TAX_QUERIES = [
     "Innovation Box regime"
 ]
 
+# Legal topics (backend key -> label)
+LEGAL_TOPICS_OPTIONS = {
+    "corporate-law": "Corporate Law",
+    "employment-law": "Employment Law",
+    "contract-law": "Contract Law",
+    "intellectual-property": "Intellectual Property",
+    "data-protection": "Data Protection"
+}
+LEGAL_TOPIC_KEYS = tuple(LEGAL_TOPICS_OPTIONS)
+
+# Selectbox options (with an empty first choice) and value -> index lookups
+INDUSTRY_OPTIONS = ("",) + tuple(INDUSTRIES)
+SIZE_OPTIONS = ("",) + tuple(COMPANY_SIZES)
+JURISDICTION_OPTIONS = ("", "Netherlands")
+INDUSTRY_INDEX = {value: i for i, value in enumerate(INDUSTRY_OPTIONS)}
+SIZE_INDEX = {value: i for i, value in enumerate(SIZE_OPTIONS)}
+COMPANY_TYPE_INDEX = {value: i for i, value in enumerate(COMPANY_TYPES)}
+JURISDICTION_INDEX = {value: i for i, value in enumerate(JURISDICTION_OPTIONS)}
+
+# Keywords behind the V2 Semantic Router preview on the review step
+BV_NAME_RE = re.compile(r"b\.?v\b|besloten|dutch limited liability", re.I)
+BV_COMPANY_TYPES = frozenset({"bv", "besloten vennootschap"})
+URGENCY_RE = re.compile(r"asap|urgent|hurry|fast", re.I)
+
+# Frontend form_data field -> backend request field (V2: timeline and
+# additional context are sent as natural language)
+FIELD_MAP = [
+    ("businessName", "companyName"),
+    ("entryGoals", "entryGoals"),
+    ("primaryJurisdiction", "primaryJurisdiction"),
+    ("selectedLegalTopics", "selectedLegalTopics"),
+    ("industry", "industry"),
+    ("companyType", "companyType"),
+    ("timeline", "timelinePreference"),
+    ("additionalContext", "additionalContext"),
+    ("currentRevenue", "currentRevenue")
+]
+
+def go_to_step(step: int):
+    """Switch to another step (button callback: the click's own rerun renders it)"""
+    st.session_state.current_step = step
+
+def submit_step(save_step, target_step: int):
+    """Form submit callback: save the step's widget values, then switch steps"""
+    save_step()
+    go_to_step(target_step)
+
+def form_navigation(step: int, save_step):
+    """Render a step form's Previous / Save & Continue submit buttons"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if step > 1:
+            st.form_submit_button(
+                "◀ Previous",
+                use_container_width=True,
+                on_click=submit_step,
+                args=(save_step, step - 1)
+            )
+    
+    with col2:
+        st.form_submit_button(
+            "Save & Continue ▶",
+            use_container_width=True,
+            type="primary",
+            on_click=submit_step,
+            args=(save_step, step + 1)
+        )
+
+def set_if_changed(key: str, value: Any):
+    """Write a form_data field only when its value actually changed"""
+    fd = st.session_state.form_data
+    if fd.get(key) != value:
+        fd[key] = value
+
+def save_step_1():
+    """Save step 1's submitted widget values to form_data"""
+    current_revenue = st.session_state.current_revenue_input
+    
+    set_if_changed("businessName", st.session_state.business_name_input)
+    set_if_changed("industry", st.session_state.industry_select)
+    set_if_changed("companySize", st.session_state.company_size_select)
+    set_if_changed("companyType", st.session_state.company_type_select)
+    set_if_changed("currentRevenue", current_revenue if current_revenue > 0 else None)
+
 def step_1_company_info():
     """Step 1: Company Information"""
+    fd = st.session_state.form_data
+    
     st.header("📊 Company Information")
     st.markdown("Tell us about your company")
     
     # V2 Feature Highlight
     st.info("💡 **V2 Feature:** You can use natural language like 'Dutch Limited Liability Company' and V2 will understand it means BV!")
     
-    # Company Name (Required)
-    business_name = st.text_input(
-        "Company Name *",
-        value=st.session_state.form_data.get("businessName", ""),
-        help="💡 V2 understands synonyms! Try: 'Dutch Limited Liability Company' or 'TechStart B.V.'",
-        placeholder="e.g., Tech Solutions Inc or Dutch Limited Liability Company"
-    )
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Industry - Fixed selection issue
-        industry_options = [""] + INDUSTRIES
-        saved_industry = st.session_state.form_data.get("industry", "")
-        industry_index = industry_options.index(saved_industry) if saved_industry in industry_options else 0
-        
-        industry = st.selectbox(
-            "Industry",
-            options=industry_options,
-            index=industry_index,
-            key="industry_select",
-            help="Select your primary industry"
+    # Widgets inside a form don't rerun the script until the step is submitted
+    with st.form("step_1_form"):
+        # Company Name (Required)
+        st.text_input(
+            "Company Name *",
+            value=fd.get("businessName", ""),
+            key="business_name_input",
+            help="💡 V2 understands synonyms! Try: 'Dutch Limited Liability Company' or 'TechStart B.V.'",
+            placeholder="e.g., Tech Solutions Inc or Dutch Limited Liability Company"
         )
         
-        # Company Size - Fixed selection issue
-        size_options = [""] + COMPANY_SIZES
-        saved_size = st.session_state.form_data.get("companySize", "")
-        size_index = size_options.index(saved_size) if saved_size in size_options else 0
+        col1, col2 = st.columns(2)
         
-        company_size = st.selectbox(
-            "Company Size",
-            options=size_options,
-            index=size_index,
-            key="company_size_select",
-            help="Select your company size"
-        )
-    
-    with col2:
-        # Company Type - Fixed selection issue
-        saved_type = st.session_state.form_data.get("companyType", "")
-        type_index = COMPANY_TYPES.index(saved_type) if saved_type in COMPANY_TYPES else 0
+        with col1:
+            # Industry - Fixed selection issue
+            saved_industry = fd.get("industry", "")
+            
+            st.selectbox(
+                "Industry",
+                options=INDUSTRY_OPTIONS,
+                index=INDUSTRY_INDEX.get(saved_industry, 0),
+                key="industry_select",
+                help="Select your primary industry"
+            )
+            
+            # Company Size - Fixed selection issue
+            saved_size = fd.get("companySize", "")
+            
+            st.selectbox(
+                "Company Size",
+                options=SIZE_OPTIONS,
+                index=SIZE_INDEX.get(saved_size, 0),
+                key="company_size_select",
+                help="Select your company size"
+            )
         
-        company_type = st.selectbox(
-            "Company Type",
-            options=COMPANY_TYPES,
-            index=type_index,
-            key="company_type_select",
-            help="💡 V2 understands: 'BV', 'Besloten Vennootschap', 'Dutch Limited Liability Company'"
-        )
+        with col2:
+            # Company Type - Fixed selection issue
+            saved_type = fd.get("companyType", "")
+            
+            st.selectbox(
+                "Company Type",
+                options=COMPANY_TYPES,
+                index=COMPANY_TYPE_INDEX.get(saved_type, 0),
+                key="company_type_select",
+                help="💡 V2 understands: 'BV', 'Besloten Vennootschap', 'Dutch Limited Liability Company'"
+            )
+            
+            # Revenue (Optional)
+            st.number_input(
+                "Current Annual Revenue (€)",
+                min_value=0.0,
+                value=float(fd.get("currentRevenue", 0)) if fd.get("currentRevenue") else 0.0,
+                step=10000.0,
+                key="current_revenue_input",
+                help="Your current annual revenue (optional)"
+            )
         
-        # Revenue (Optional)
-        current_revenue = st.number_input(
-            "Current Annual Revenue (€)",
-            min_value=0.0,
-            value=float(st.session_state.form_data.get("currentRevenue", 0)) if st.session_state.form_data.get("currentRevenue") else 0.0,
-            step=10000.0,
-            key="current_revenue_input",
-            help="Your current annual revenue (optional)"
-        )
-    
-    # Save to session state
-    st.session_state.form_data["businessName"] = business_name
-    st.session_state.form_data["industry"] = industry
-    st.session_state.form_data["companySize"] = company_size
-    st.session_state.form_data["companyType"] = company_type
-    st.session_state.form_data["currentRevenue"] = current_revenue if current_revenue > 0 else None
+        form_navigation(1, save_step_1)
+
+def save_step_2():
+    """Save step 2's submitted widget values to form_data"""
+    set_if_changed("entryGoals", st.session_state.entry_goals_select)
+    set_if_changed("timeline", st.session_state.timeline_input)
+    set_if_changed("primaryJurisdiction", st.session_state.jurisdiction_select or "Netherlands")
 
 def step_2_goals_timeline():
     """Step 2: Goals & Timeline"""
+    fd = st.session_state.form_data
+    
     st.header("🎯 Goals & Timeline")
     st.markdown("What are your goals and timeline?")
     
@@ -193,50 +319,52 @@ def step_2_goals_timeline():
     # Entry Goals - Fixed selection issue
     # Initialize widget state from form_data only if key doesn't exist (first time)
     if "entry_goals_select" not in st.session_state:
-        st.session_state.entry_goals_select = st.session_state.form_data.get("entryGoals", [])
-    
-    # Use the widget's key to manage state - Streamlit handles this automatically
-    # The widget will use st.session_state.entry_goals_select if it exists
-    entry_goals = st.multiselect(
-        "Entry Goals",
-        options=ENTRY_GOALS,
-        key="entry_goals_select",
-        help="Select all that apply"
-    )
-    
-    # Always sync widget value to form_data for persistence across steps
-    st.session_state.form_data["entryGoals"] = entry_goals
-    
-    # Timeline - V2: Text input for natural language
-    st.subheader("Timeline Preference")
-    timeline = st.text_input(
-        "When do you plan to enter the market?",
-        value=st.session_state.form_data.get("timeline", ""),
-        key="timeline_input",
-        help="💡 V2 understands natural language! Examples: 'ASAP', 'I need this urgently', 'within 1 month', '3-6 months'",
-        placeholder="e.g., ASAP, 3 months, I need this urgently"
-    )
-    
-    # Primary Jurisdiction - Fixed selection issue
-    st.subheader("Target Jurisdiction")
-    jurisdiction_options = ["", "Netherlands"]
-    saved_jurisdiction = st.session_state.form_data.get("primaryJurisdiction", "")
-    jurisdiction_index = jurisdiction_options.index(saved_jurisdiction) if saved_jurisdiction in jurisdiction_options else 0
-    
-    primary_jurisdiction = st.selectbox(
-        "Primary Jurisdiction",
-        options=jurisdiction_options,
-        index=jurisdiction_index,
-        key="jurisdiction_select",
-        help="Currently supports Netherlands"
-    )
-    
-    # Save to session state (entryGoals already saved above)
-    st.session_state.form_data["timeline"] = timeline
-    st.session_state.form_data["primaryJurisdiction"] = primary_jurisdiction or "Netherlands"
+        st.session_state.entry_goals_select = fd.get("entryGoals", [])
+    
+    with st.form("step_2_form"):
+        # Use the widget's key to manage state - Streamlit handles this automatically
+        # The widget will use st.session_state.entry_goals_select if it exists
+        st.multiselect(
+            "Entry Goals",
+            options=ENTRY_GOALS,
+            key="entry_goals_select",
+            help="Select all that apply"
+        )
+        
+        # Timeline - V2: Text input for natural language
+        st.subheader("Timeline Preference")
+        st.text_input(
+            "When do you plan to enter the market?",
+            value=fd.get("timeline", ""),
+            key="timeline_input",
+            help="💡 V2 understands natural language! Examples: 'ASAP', 'I need this urgently', 'within 1 month', '3-6 months'",
+            placeholder="e.g., ASAP, 3 months, I need this urgently"
+        )
+        
+        # Primary Jurisdiction - Fixed selection issue
+        st.subheader("Target Jurisdiction")
+        saved_jurisdiction = fd.get("primaryJurisdiction", "")
+        
+        st.selectbox(
+            "Primary Jurisdiction",
+            options=JURISDICTION_OPTIONS,
+            index=JURISDICTION_INDEX.get(saved_jurisdiction, 0),
+            key="jurisdiction_select",
+            help="Currently supports Netherlands"
+        )
+        
+        form_navigation(2, save_step_2)
+
+def save_step_3():
+    """Save step 3's submitted widget values to form_data"""
+    # The custom query is kept separately and merged in by all_tax_queries()
+    set_if_changed("taxQueries", st.session_state.tax_queries_select)
+    set_if_changed("customTaxQuery", st.session_state.custom_tax_query_input)
 
 def step_3_tax_considerations():
     """Step 3: Tax Considerations"""
+    fd = st.session_state.form_data
+    
     st.header("💰 Tax Considerations")
     st.markdown("Tell us about your tax concerns")
     
@@ -246,90 +374,79 @@ def step_3_tax_considerations():
     # Tax Queries - Fixed selection issue
     # Initialize widget state from form_data only if key doesn't exist (first time)
     if "tax_queries_select" not in st.session_state:
-        st.session_state.tax_queries_select = st.session_state.form_data.get("taxQueries", [])
-    
-    # Use the widget's key to manage state - Streamlit handles this automatically
-    tax_queries = st.multiselect(
-        "Tax Queries",
-        options=TAX_QUERIES,
-        key="tax_queries_select",
-        help="Select all relevant tax queries"
-    )
-    
-    # Always sync widget value to form_data for persistence across steps
-    st.session_state.form_data["taxQueries"] = tax_queries
-    
-    # Custom tax query
-    custom_tax_query = st.text_input(
-        "Custom Tax Query (optional)",
-        value=st.session_state.form_data.get("customTaxQuery", ""),
-        key="custom_tax_query_input",
-        help="Add a custom tax query if needed"
-    )
-    
-    if custom_tax_query:
-        if tax_queries is None:
-            tax_queries = []
-        tax_queries.append(f"Custom: {custom_tax_query}")
-        st.session_state.form_data["taxQueries"] = tax_queries
-    
-    # Save custom tax query to session state
-    st.session_state.form_data["customTaxQuery"] = custom_tax_query
+        st.session_state.tax_queries_select = fd.get("taxQueries", [])
+    
+    with st.form("step_3_form"):
+        # Use the widget's key to manage state - Streamlit handles this automatically
+        st.multiselect(
+            "Tax Queries",
+            options=TAX_QUERIES,
+            key="tax_queries_select",
+            help="Select all relevant tax queries"
+        )
+        
+        # Custom tax query
+        st.text_input(
+            "Custom Tax Query (optional)",
+            value=fd.get("customTaxQuery", ""),
+            key="custom_tax_query_input",
+            help="Add a custom tax query if needed"
+        )
+        
+        form_navigation(3, save_step_3)
+
+def save_step_4():
+    """Save step 4's submitted widget values to form_data"""
+    set_if_changed("selectedLegalTopics", st.session_state.legal_topics_select)
+    set_if_changed("additionalContext", st.session_state.additional_context_input)
 
 def step_4_additional_context():
     """Step 4: Additional Context"""
+    fd = st.session_state.form_data
+    
     st.header("📝 Additional Context")
     st.markdown("Any additional information or specific questions?")
     
     # V2 Feature Highlight
     st.success("✨ **V2 Power:** This is where V2 shines! Write in natural language and V2 will extract all relevant information.")
     
-    additional_context = st.text_area(
-        "Additional Context or Questions",
-        value=st.session_state.form_data.get("additionalContext", ""),
-        key="additional_context_input",
-        help="💡 V2 can extract information from natural language! Example: 'I want a Dutch BV structure for my tech startup. I need to hire employees and this is urgent.'",
-        height=200,
-        placeholder="e.g., I want to establish a Dutch limited liability company quickly. I'm in the software industry and need to hire employees. This is urgent - I need to start operations within a month."
-    )
-    
-    # Legal Topics (Optional)
-    st.subheader("Legal Topics (Optional)")
-    legal_topics_options = {
-        "corporate-law": "Corporate Law",
-        "employment-law": "Employment Law",
-        "contract-law": "Contract Law",
-        "intellectual-property": "Intellectual Property",
-        "data-protection": "Data Protection"
-    }
-    
     # Legal Topics - Fixed selection issue
     # Initialize widget state from form_data only if key doesn't exist (first time)
     if "legal_topics_select" not in st.session_state:
-        st.session_state.legal_topics_select = st.session_state.form_data.get("selectedLegalTopics", [])
-    
-    # Use the widget's key to manage state - Streamlit handles this automatically
-    selected_topics = st.multiselect(
-        "Legal Topics",
-        options=list(legal_topics_options.keys()),
-        format_func=lambda x: legal_topics_options[x],
-        key="legal_topics_select",
-        help="Select relevant legal topics"
-    )
-    
-    # Always sync widget value to form_data for persistence across steps
-    st.session_state.form_data["selectedLegalTopics"] = selected_topics
-    
-    # Save to session state
-    st.session_state.form_data["additionalContext"] = additional_context
+        st.session_state.legal_topics_select = fd.get("selectedLegalTopics", [])
+    
+    with st.form("step_4_form"):
+        st.text_area(
+            "Additional Context or Questions",
+            value=fd.get("additionalContext", ""),
+            key="additional_context_input",
+            help="💡 V2 can extract information from natural language! Example: 'I want a Dutch BV structure for my tech startup. I need to hire employees and this is urgent.'",
+            height=200,
+            placeholder="e.g., I want to establish a Dutch limited liability company quickly. I'm in the software industry and need to hire employees. This is urgent - I need to start operations within a month."
+        )
+        
+        st.subheader("Legal Topics (Optional)")
+        
+        # Use the widget's key to manage state - Streamlit handles this automatically
+        st.multiselect(
+            "Legal Topics",
+            options=LEGAL_TOPIC_KEYS,
+            format_func=LEGAL_TOPICS_OPTIONS.__getitem__,
+            key="legal_topics_select",
+            help="Select relevant legal topics"
+        )
+        
+        form_navigation(4, save_step_4)
 
 def step_5_review_and_generate():
     """Step 5: Review & Generate"""
+    fd = st.session_state.form_data
+    
     st.header("📋 Review & Generate")
     st.markdown("Review your inputs and generate your tax memo")
     
     # Validation
-    if not st.session_state.form_data.get("businessName"):
+    if not fd.get("businessName"):
         st.error("❌ Company Name is required. Please go back to Step 1.")
         return
     
@@ -338,33 +455,29 @@ def step_5_review_and_generate():
     
     col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("**Company Information**")
-        st.write(f"- **Name:** {st.session_state.form_data.get('businessName', 'N/A')}")
-        st.write(f"- **Industry:** {st.session_state.form_data.get('industry', 'Not specified')}")
-        st.write(f"- **Size:** {st.session_state.form_data.get('companySize', 'Not specified')}")
-        st.write(f"- **Type:** {st.session_state.form_data.get('companyType', 'Not specified')}")
-        
-        if st.session_state.form_data.get('currentRevenue'):
-            st.write(f"- **Current Revenue:** €{st.session_state.form_data.get('currentRevenue'):,.0f}")
-    
-    with col2:
-        st.markdown("**Goals & Timeline**")
-        entry_goals = st.session_state.form_data.get('entryGoals', [])
-        if entry_goals:
-            for goal in entry_goals:
-                st.write(f"- {goal}")
-        else:
-            st.write("- No goals specified")
-        st.write(f"- **Timeline:** {st.session_state.form_data.get('timeline', 'Not specified')}")
-        st.write(f"- **Jurisdiction:** {st.session_state.form_data.get('primaryJurisdiction', 'Not specified')}")
-        
-        st.markdown("**Tax Considerations**")
-        tax_queries = st.session_state.form_data.get('taxQueries', [])
-        if tax_queries:
-            st.write(f"- {len(tax_queries)} tax query/queries selected")
-        else:
-            st.write("- No tax queries specified")
+    company_lines = [
+        f"- **Name:** {fd.get('businessName', 'N/A')}",
+        f"- **Industry:** {fd.get('industry', 'Not specified')}",
+        f"- **Size:** {fd.get('companySize', 'Not specified')}",
+        f"- **Type:** {fd.get('companyType', 'Not specified')}",
+    ]
+    if fd.get('currentRevenue'):
+        company_lines.append(f"- **Current Revenue:** €{fd.get('currentRevenue'):,.0f}")
+    
+    entry_goals = fd.get('entryGoals', [])
+    goal_lines = [f"- {goal}" for goal in entry_goals] or ["- No goals specified"]
+    goal_lines.append(f"- **Timeline:** {fd.get('timeline', 'Not specified')}")
+    goal_lines.append(f"- **Jurisdiction:** {fd.get('primaryJurisdiction', 'Not specified')}")
+    
+    tax_queries = all_tax_queries(fd)
+    tax_line = f"- {len(tax_queries)} tax query/queries selected" if tax_queries else "- No tax queries specified"
+    
+    # One markdown element per column instead of one per line
+    col1.markdown("**Company Information**\n\n" + "\n".join(company_lines))
+    col2.markdown(
+        "**Goals & Timeline**\n\n" + "\n".join(goal_lines)
+        + "\n\n**Tax Considerations**\n\n" + tax_line
+    )
     
     # V2 Classification Preview
     st.markdown("---")
@@ -373,27 +486,24 @@ def step_5_review_and_generate():
     preview_info = []
     
     # Check for BV indicators
-    company_name = st.session_state.form_data.get('businessName', '').lower()
-    company_type = st.session_state.form_data.get('companyType', '').lower()
-    additional_context = st.session_state.form_data.get('additionalContext', '').lower()
+    company_type = fd.get('companyType', '').lower()
     
-    if any(x in company_name for x in ['b.v', 'bv', 'besloten', 'dutch limited liability']):
+    if BV_NAME_RE.search(fd.get('businessName', '')):
         preview_info.append("✅ **Entity Type:** BV detected (V2 understands synonyms!)")
-    elif company_type in ['bv', 'besloten vennootschap']:
+    elif company_type in BV_COMPANY_TYPES:
         preview_info.append("✅ **Entity Type:** BV detected")
     
     # Check for urgency
-    timeline = st.session_state.form_data.get('timeline', '').lower()
-    if any(x in timeline for x in ['asap', 'urgent', 'urgently', 'hurry', 'fast']):
+    if URGENCY_RE.search(fd.get('timeline', '')):
         preview_info.append("✅ **Urgency:** HIGH detected (V2 understands natural language!)")
     
-    # Check for holding company
-    tax_queries_str = ' '.join(st.session_state.form_data.get('taxQueries', [])).lower()
-    if 'participation exemption' in tax_queries_str or 'holding' in company_type:
+    # Check for holding company (stops at the first matching query)
+    has_participation = any('participation exemption' in q.lower() for q in all_tax_queries(fd))
+    if has_participation or 'holding' in company_type:
         preview_info.append("✅ **Company Type:** Holding company detected (V2 understands context!)")
     
     # Check for tech industry
-    industry = st.session_state.form_data.get('industry', '').lower()
+    industry = fd.get('industry', '').lower()
     if 'software' in industry or 'technology' in industry:
         preview_info.append("✅ **Industry:** Tech detected - R&D incentives will be included")
     
@@ -408,11 +518,11 @@ def step_5_review_and_generate():
     st.markdown("### ✨ Special Features Activated")
     
     special_features = []
-    if st.session_state.form_data.get('industry') == "Software & Technology":
+    if fd.get('industry') == "Software & Technology":
         special_features.append("🔬 **WBSO & Innovation Box Research** - Automatic research for R&D tax credits")
-    if "Hire employees" in st.session_state.form_data.get('entryGoals', []):
+    if "Hire employees" in fd.get('entryGoals', []):
         special_features.append("👥 **Employment Law Research** - Automatic research for payroll tax and employment contracts")
-    if st.session_state.form_data.get('companyType') == "Holding Company" or any("participation exemption" in str(q).lower() for q in st.session_state.form_data.get('taxQueries', [])):
+    if fd.get('companyType') == "Holding Company" or has_participation:
         special_features.append("🏢 **Holding Company Path** - Specialized research for participation exemption and BV structure")
     
     if special_features:
@@ -426,81 +536,91 @@ def step_5_review_and_generate():
     if st.button("🚀 Generate Memo with V2", type="primary", use_container_width=True):
         generate_memo()
 
+def all_tax_queries(frontend_data: Dict[str, Any]) -> List[str]:
+    """Selected tax queries plus the custom query, if any"""
+    queries = list(frontend_data.get("taxQueries") or [])
+    if frontend_data.get("customTaxQuery"):
+        queries.append(f"Custom: {frontend_data['customTaxQuery']}")
+    return queries
+
 def map_frontend_to_backend(frontend_data: Dict[str, Any]) -> Dict[str, Any]:
     """Map frontend field names to backend field names"""
-    backend_data = {}
-    
-    # Required field
-    if frontend_data.get("businessName"):
-        backend_data["companyName"] = frontend_data["businessName"]
-    
-    # Direct mappings
-    if frontend_data.get("entryGoals"):
-        backend_data["entryGoals"] = frontend_data["entryGoals"]
-    
-    if frontend_data.get("primaryJurisdiction"):
-        backend_data["primaryJurisdiction"] = frontend_data["primaryJurisdiction"]
-    
-    if frontend_data.get("taxQueries"):
-        backend_data["taxConsiderations"] = frontend_data["taxQueries"]
+    # Copy every filled-in field under its backend name
+    backend_data = {
+        backend_field: frontend_data[frontend_field]
+        for frontend_field, backend_field in FIELD_MAP
+        if frontend_data.get(frontend_field)
+    }
     
-    if frontend_data.get("selectedLegalTopics"):
-        backend_data["selectedLegalTopics"] = frontend_data["selectedLegalTopics"]
+    tax_queries = all_tax_queries(frontend_data)
+    if tax_queries:
+        backend_data["taxConsiderations"] = tax_queries
     
     # Handle companySize -> employeeCount conversion
-    if frontend_data.get("companySize"):
-        size_map = {
-            "Startup (1-10 employees)": 5,
-            "Small (11-50 employees)": 25,
-            "Medium (51-250 employees)": 100,
-            "Large (251+ employees)": 500
-        }
-        if frontend_data["companySize"] in size_map:
-            backend_data["employeeCount"] = size_map[frontend_data["companySize"]]
-    
-    # Handle industry
-    if frontend_data.get("industry"):
-        backend_data["industry"] = frontend_data["industry"]
-    
-    # Handle companyType
-    if frontend_data.get("companyType"):
-        backend_data["companyType"] = frontend_data["companyType"]
-    
-    # Handle timeline (V2: natural language)
-    if frontend_data.get("timeline"):
-        backend_data["timelinePreference"] = frontend_data["timeline"]
-    
-    # Handle additional context (V2: extracts info from natural language)
-    if frontend_data.get("additionalContext"):
-        backend_data["additionalContext"] = frontend_data["additionalContext"]
-    
-    # Handle revenue
-    if frontend_data.get("currentRevenue"):
-        backend_data["currentRevenue"] = frontend_data["currentRevenue"]
+    employee_count = SIZE_MAP.get(frontend_data.get("companySize"))
+    if employee_count:
+        backend_data["employeeCount"] = employee_count
     
     return backend_data
 
+def read_memo_stream(response: "requests.Response", status_placeholder) -> Optional[Dict[str, Any]]:
+    """Show the progress events of a /generate-memo/stream response and return the memo (None on error)"""
+    memo = None
+    with response:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if "status" in event:
+                status_placeholder.info(f"⏳ {event['status']}")
+            elif "memo" in event:
+                memo = event["memo"]
+            elif "error" in event:
+                st.error(f"❌ Error: {event['error']}")
+    status_placeholder.empty()
+    return memo
+
 def generate_memo():
     """Generate memo by calling backend API"""
+    import requests
+    
     # Map frontend data to backend format
     backend_request = map_frontend_to_backend(st.session_state.form_data)
+    session = get_http_session()
     
     # Show request being sent
     with st.spinner("🔄 Generating your memo with V2 Semantic Router... This may take 30-60 seconds."):
         try:
-            response = requests.post(
-                f"{API_URL}/generate-memo",
+            # Progress events are shown here as the backend works through the memo
+            status_placeholder = st.empty()
+            memo = None
+            response = session.post(
+                f"{API_URL}/generate-memo/stream",
                 json=backend_request,
-                timeout=180
+                stream=True,
+                timeout=(5, 180)  # (connect, read between events)
             )
             
-            if response.status_code == 200:
-                memo = response.json()
+            if response.status_code == 404:
+                # Backend without the streaming endpoint
+                response.close()
+                response = session.post(
+                    f"{API_URL}/generate-memo",
+                    json=backend_request,
+                    timeout=(5, 180)  # (connect, read)
+                )
+                if response.status_code == 200:
+                    memo = response.json()
+            elif response.status_code == 200:
+                memo = read_memo_stream(response, status_placeholder)
+            
+            if memo:
                 st.session_state.memo_result = memo
-                st.success("✅ Memo generated successfully with V2!")
-                st.balloons()
-                st.rerun()
-            else:
+                # Serialize once (compact UTF-8) for the download button instead of on every rerun
+                st.session_state.memo_json_bytes = serialize_memo(memo)
+                # The memo renders further down in this same run, so no st.rerun() is needed
+                st.toast("✅ Memo generated successfully with V2!", icon="🎉")
+            elif response.status_code != 200:
                 st.error(f"❌ Error: {response.status_code}")
                 try:
                     error_detail = response.json()
@@ -517,8 +637,18 @@ def generate_memo():
         except Exception as e:
             st.error(f"❌ Error: {str(e)}")
 
+def serialize_memo(memo: Dict[str, Any]) -> bytes:
+    """Compact UTF-8 JSON of the memo for the download button"""
+    return json.dumps(memo, separators=(",", ":")).encode("utf-8")
+
+def render_bullets(title: str, items: List[str]):
+    """Render a bold title and its bullet items as a single markdown element"""
+    st.markdown("  \n".join([title] + [f"• {item}" for item in items]))
+
 def display_memo():
     """Display the generated memo in a clear, readable format"""
+    from datetime import datetime
+    
     if "memo_result" not in st.session_state:
         return
     
@@ -547,14 +677,10 @@ def display_memo():
             st.write(exec_sum["overview"])
         
         if exec_sum.get("keyRecommendations"):
-            st.markdown("**✅ Key Recommendations:**")
-            for rec in exec_sum["keyRecommendations"]:
-                st.markdown(f"• {rec}")
+            render_bullets("**✅ Key Recommendations:**", exec_sum["keyRecommendations"])
         
         if exec_sum.get("criticalConsiderations"):
-            st.markdown("**⚠️ Critical Considerations:**")
-            for cons in exec_sum["criticalConsiderations"]:
-                st.markdown(f"• {cons}")
+            render_bullets("**⚠️ Critical Considerations:**", exec_sum["criticalConsiderations"])
         
         st.markdown("---")
     
@@ -569,19 +695,13 @@ def display_memo():
                 st.metric("Corporate Tax Rate", tax["corporateTaxRate"])
         
         if tax.get("taxObligations"):
-            st.markdown("**📋 Tax Obligations:**")
-            for obl in tax["taxObligations"]:
-                st.markdown(f"• {obl}")
+            render_bullets("**📋 Tax Obligations:**", tax["taxObligations"])
         
         if tax.get("taxOptimizationStrategies"):
-            st.markdown("**💡 Tax Optimization Strategies:**")
-            for strat in tax["taxOptimizationStrategies"]:
-                st.markdown(f"• {strat}")
+            render_bullets("**💡 Tax Optimization Strategies:**", tax["taxOptimizationStrategies"])
         
         if tax.get("specialRegimes"):
-            st.markdown("**🎯 Special Tax Regimes:**")
-            for regime in tax["specialRegimes"]:
-                st.markdown(f"• {regime}")
+            render_bullets("**🎯 Special Tax Regimes:**", tax["specialRegimes"])
         
         st.markdown("---")
     
@@ -611,21 +731,23 @@ def display_memo():
         
         if timeline.get("phases"):
             st.markdown("**Phases:**")
+            # One column block for all phases; durations are labelled per phase
+            # since the two columns no longer line up row by row
+            descriptions = []
+            durations = []
             for i, phase in enumerate(timeline["phases"], 1):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.markdown(f"**Phase {i}: {phase.get('phase', 'Phase')}**")
-                    if phase.get("description"):
-                        st.write(phase["description"])
-                    elif phase.get("details"):
-                        st.write(phase["details"])
-                with col2:
-                    st.markdown(f"**Duration:** {phase.get('duration', 'N/A')}")
+                text = f"**Phase {i}: {phase.get('phase', 'Phase')}**"
+                details = phase.get("description") or phase.get("details")
+                if details:
+                    text += f"  \n{details}"
+                descriptions.append(text)
+                durations.append(f"**Phase {i}:** {phase.get('duration', 'N/A')}")
+            col1, col2 = st.columns([3, 1])
+            col1.markdown("\n\n".join(descriptions))
+            col2.markdown("**Duration**  \n" + "  \n".join(durations))
         
         if timeline.get("milestones"):
-            st.markdown("**🎯 Key Milestones:**")
-            for milestone in timeline["milestones"]:
-                st.markdown(f"• {milestone}")
+            render_bullets("**🎯 Key Milestones:**", timeline["milestones"])
         
         st.markdown("---")
     
@@ -650,10 +772,10 @@ def display_memo():
     # Download and Full JSON
     col1, col2 = st.columns(2)
     with col1:
-        json_str = json.dumps(memo, indent=2)
+        json_bytes = st.session_state.get("memo_json_bytes") or serialize_memo(memo)
         st.download_button(
             label="📥 Download Memo (JSON)",
-            data=json_str,
+            data=json_bytes,
             file_name=f"tax_memo_v2_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json"
         )
@@ -661,6 +783,14 @@ def display_memo():
         with st.expander("🔍 View Full JSON Response"):
             st.json(memo)
 
+def reset_form():
+    """Reset button callback: clear the form and generated memo, back to step 1"""
+    st.session_state.form_data = {}
+    st.session_state.current_step = 1
+    if "memo_result" in st.session_state:
+        del st.session_state.memo_result
+    st.session_state.pop("memo_json_bytes", None)
+
 def main():
     """Main application"""
     st.title("📋 Tax Memo Generator")
@@ -674,9 +804,13 @@ def main():
     # Step navigation
     for step_num in range(1, TOTAL_STEPS + 1):
         step_name = STEP_NAMES[step_num]
-        if st.sidebar.button(f"Step {step_num}: {step_name}", key=f"nav_{step_num}", use_container_width=True):
-            st.session_state.current_step = step_num
-            st.rerun()
+        st.sidebar.button(
+            f"Step {step_num}: {step_name}",
+            key=f"nav_{step_num}",
+            use_container_width=True,
+            on_click=go_to_step,
+            args=(step_num,)
+        )
     
     st.sidebar.divider()
     
@@ -685,14 +819,18 @@ def main():
     st.sidebar.progress(progress)
     st.sidebar.caption(f"Step {st.session_state.current_step} of {TOTAL_STEPS}")
     
-    # V2 Features in Sidebar
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### ✨ V2 Features")
-    st.sidebar.markdown("**Understands:**")
-    st.sidebar.markdown("- Synonyms")
-    st.sidebar.markdown("- Natural language")
-    st.sidebar.markdown("- Context")
-    st.sidebar.markdown("- Typos & variations")
+    # V2 Features in Sidebar (one markdown element)
+    st.sidebar.markdown("""
+---
+
+### ✨ V2 Features
+
+**Understands:**
+- Synonyms
+- Natural language
+- Context
+- Typos & variations
+""")
     
     # Main content area
     if st.session_state.current_step == 1:
@@ -706,33 +844,22 @@ def main():
     elif st.session_state.current_step == 5:
         step_5_review_and_generate()
     
-    # Navigation buttons
+    # Navigation buttons (steps 1-4 navigate with their form's submit buttons)
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
-        if st.session_state.current_step > 1:
-            if st.button("◀ Previous", use_container_width=True):
-                st.session_state.current_step -= 1
-                st.rerun()
-    
-    with col2:
-        if st.session_state.current_step < TOTAL_STEPS:
-            if st.button("Next ▶", use_container_width=True, type="primary"):
-                st.session_state.current_step += 1
-                st.rerun()
+        if st.session_state.current_step == TOTAL_STEPS:
+            st.button("◀ Previous", use_container_width=True, on_click=go_to_step, args=(TOTAL_STEPS - 1,))
     
     with col3:
-        if st.button("🔄 Reset", use_container_width=True):
-            st.session_state.form_data = {}
-            st.session_state.current_step = 1
-            if "memo_result" in st.session_state:
-                del st.session_state.memo_result
-            st.rerun()
+        st.button("🔄 Reset", use_container_width=True, on_click=reset_form)
     
     # Display memo if generated
     if "memo_result" in st.session_state:
         st.divider()
-        display_memo()
+        # The memo is only rendered while shown, so hiding it keeps step reruns light
+        if st.toggle("📄 View Generated Memo", value=True, key="show_memo"):
+            display_memo()
 
 if __name__ == "__main__":
     main()